@@ -0,0 +1,44 @@
+"""
+Compare the finviz_extractors backends on saved screener pages.
+
+    python benchmarks/bench_extractors.py [page.html ...]
+
+With no arguments every .html file in benchmarks/fixtures is used. Save a page
+from the browser ("Save Page As... > HTML only") to benchmark against live markup.
+Exits non-zero if the backends disagree on any page.
+"""
+import glob
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from finviz_extractors import EXTRACTORS
+
+
+def main(paths, number=200):
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(ROOT, "benchmarks", "fixtures", "*.html")))
+
+    mismatches = 0
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+
+        results = {name: extract(html) for name, extract in EXTRACTORS.items()}
+        reference = results["bs4"]
+        print(f"{os.path.basename(path)}: {len(html) / 1024:.0f} KiB, {len(reference)} tickers")
+
+        for name, extract in EXTRACTORS.items():
+            per_call = timeit.timeit(lambda: extract(html), number=number) / number
+            same = results[name] == reference
+            mismatches += not same
+            print(f"  {name:<6} {per_call * 1000:8.3f} ms/page  {'ok' if same else 'MISMATCH'}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""
+Micro-benchmarks for ticker_list.TickerLinkedList.
+
+    python benchmarks/bench_ticker_list.py [size ...]
+
+Defaults to 10k and 100k symbols. Every operation is timed over the whole
+list and reported per call, so the numbers should stay flat as size grows.
+"""
+import os
+import random
+import string
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ticker_list import TickerLinkedList
+
+
+def make_symbols(n, seed=0):
+    rng = random.Random(seed)
+    symbols = set()
+    while len(symbols) < n:
+        symbols.add("".join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5))))
+    return sorted(symbols)
+
+
+def timed(label, n, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24} {elapsed * 1000:9.2f} ms total  {elapsed / n * 1e6:7.3f} us/op")
+
+
+def run(size):
+    symbols = make_symbols(size)
+    shuffled = symbols[:]
+    random.Random(1).shuffle(shuffled)
+    half = shuffled[: size // 2]
+    print(f"{size} symbols")
+
+    ring = TickerLinkedList()
+    timed("add (sorted build)", size, lambda: ring.extend(symbols))
+    timed("find", size, lambda: [ring.find(s) for s in shuffled])
+    timed("remove (random half)", len(half), lambda: [ring.remove(s) for s in half])
+    timed("insert_sorted (random)", len(half), lambda: [ring.insert_sorted(s) for s in half])
+    assert list(ring) == symbols, "ring lost sorted order"
+
+    diff = TickerLinkedList(symbols)
+    changed = shuffled[: max(1, size // 100)]
+    def refresh_diff():
+        for s in changed:
+            diff.remove(s)
+        for s in changed:
+            diff.insert_sorted(s)
+    timed("1% remove+reinsert", 2 * len(changed), refresh_diff)
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+    for size in sizes:
+        run(size)
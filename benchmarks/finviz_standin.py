@@ -0,0 +1,217 @@
+"""
+Local stand-in for finviz.com/screener.ashx so scraper changes can be tested
+offline and under throttling.
+
+    python benchmarks/finviz_standin.py --total 1000 --latency 0.05 --max-rps 5
+
+Any screener.ashx URL is answered: pages are rebuilt from a recorded page in
+benchmarks/fixtures, so the markup matches the real site, with the row
+numbers, tickers and "#r / total Total" counter rewritten for the requested
+r= offset. v=411 gets the compact "Tickers" view instead, 1000 symbols per
+page. Faults can be injected:
+
+  --latency / --jitter   seconds added to every response
+  --max-rps              answer 429 + Retry-After when requests come faster
+  --throttle-rate        fraction of requests answered 429 regardless
+  --drop-rate            fraction of connections closed without a response
+  --truncate-rate        fraction of pages cut off partway through the table
+
+GET /stats returns the request counters as JSON.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import string
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURE = os.path.join(ROOT, "benchmarks", "fixtures", "screener_v111_first.html")
+
+_ROW = re.compile(r'<tr\b[^>]*\bstyled-row\b[^>]*>.*?</tr>\s*', re.S)
+_TICKER_CELL = re.compile(r'(<td\b[^>]*>(?:<a\b[^>]*>)?)([^<]+)(</)')
+_TOTAL = re.compile(r'#\d+\s*/\s*\d+\s*Total')
+_TABLE = re.compile(r'<table\b[^>]*\bscreener_table\b[^>]*>')
+_PAGE_SIZE = 20
+_TICKERS_PAGE_SIZE = 1000
+
+
+def symbol_for(index):
+    """Deterministic unique ticker for a 1-based row number: A, B, ... Z, AA, AB, ..."""
+    letters = string.ascii_uppercase
+    name = ""
+    n = index
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        name = letters[rem] + name
+    return name
+
+
+class ScreenerTemplate:
+    """Splits a recorded page into head, row templates and tail."""
+
+    def __init__(self, html):
+        rows = list(_ROW.finditer(html))
+        if not rows:
+            raise ValueError("recorded page has no screener rows")
+        self.head = html[:rows[0].start()]
+        self.tail = html[rows[-1].end():]
+        # Around the whole table, for the tickers view
+        table = _TABLE.search(self.head)
+        self.before_table = self.head[:table.end()] if table else self.head
+        self.after_table = self.tail
+        self.rows = [m.group(0) for m in rows]
+        self.tickers = [self._cells(row)[1][1] for row in self.rows]
+
+    def _cells(self, row):
+        return _TICKER_CELL.findall(row)
+
+    def render_row(self, number):
+        template = self.rows[(number - 1) % len(self.rows)]
+        old = self.tickers[(number - 1) % len(self.rows)]
+        new = symbol_for(number)
+        row = template.replace(f"t={old}&", f"t={new}&").replace(f">{old}<", f">{new}<")
+        # First cell is the row number
+        return re.sub(r'(<td\b[^>]*>(?:<a\b[^>]*>)?)\d+(</)', rf'\g<1>{number}\g<2>', row, count=1)
+
+    def render(self, offset, total):
+        numbers = range(offset, min(offset + _PAGE_SIZE, total + 1))
+        head = _TOTAL.sub(f"#{offset} / {total} Total", self.head)
+        return head + "".join(self.render_row(n) for n in numbers) + self.tail
+
+    def render_tickers(self, offset, total):
+        """A v=411 page: the symbols as quote links in a single cell."""
+        numbers = range(offset, min(offset + _TICKERS_PAGE_SIZE, total + 1))
+        links = "&nbsp;".join(f'<a href="quote.ashx?t={symbol_for(n)}&amp;ty=c&amp;p=d&amp;b=1" '
+                              f'class="tab-link">{symbol_for(n)}</a>' for n in numbers)
+        head = _TOTAL.sub(f"#{offset} / {total} Total", self.before_table)
+        return head + f'\n<tr><td class="screener-tickers">{links}</td></tr>\n' + self.after_table
+
+
+class StandinState:
+    def __init__(self, args):
+        with open(args.fixture, encoding="utf-8") as f:
+            self.template = ScreenerTemplate(f.read())
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.lock = threading.Lock()
+        self.recent = []
+        self.stats = {"requests": 0, "pages": 0, "throttled": 0, "dropped": 0, "truncated": 0}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def roll(self, rate):
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def over_rate(self):
+        if not self.args.max_rps:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            self.recent = [t for t in self.recent if now - t < 1.0]
+            if len(self.recent) >= self.args.max_rps:
+                return True
+            self.recent.append(now)
+            return False
+
+
+def make_handler(state):
+    args = state.args
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):
+            if args.verbose:
+                super().log_message(*a)
+
+        def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == "/stats":
+                with state.lock:
+                    body = json.dumps(state.stats).encode()
+                return self._send(200, body, "application/json")
+            if not parsed.path.endswith("screener.ashx"):
+                return self._send(404, b"not found")
+
+            state.count("requests")
+            if args.latency or args.jitter:
+                time.sleep(args.latency + random.uniform(0, args.jitter))
+
+            if state.roll(args.drop_rate):
+                state.count("dropped")
+                self.close_connection = True
+                self.connection.close()
+                return
+
+            if state.over_rate() or state.roll(args.throttle_rate):
+                state.count("throttled")
+                return self._send(429, b"Too Many Requests", "text/plain",
+                                  {"Retry-After": str(args.retry_after)})
+
+            query = parse_qs(parsed.query)
+            offset = max(1, int(query.get("r", ["1"])[0]))
+            render = state.template.render_tickers if query.get("v") == ["411"] else state.template.render
+            body = render(min(offset, max(1, args.total)), args.total).encode("utf-8")
+            if state.roll(args.truncate_rate):
+                state.count("truncated")
+                cut = max(body.find(b'styled-row'), body.find(b'screener-tickers'))
+                body = body[:cut + (len(body) - cut) // 2] if cut != -1 else body[:len(body) // 2]
+            state.count("pages")
+            self._send(200, body)
+
+    return Handler
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Local Finviz screener stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="recorded screener page to rebuild rows from")
+    parser.add_argument("--total", type=int, default=500, help="results the screen reports")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+
+def start(args):
+    """Start the stand-in on a background thread. Returns (server, state)."""
+    state = StandinState(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    server, _ = start(args)
+    print(f"Finviz stand-in on http://{args.host}:{server.server_port}/screener.ashx?v=111 "
+          f"({args.total} results)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
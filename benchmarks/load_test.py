@@ -0,0 +1,90 @@
+"""
+Load-test the scraper against the local Finviz stand-in.
+
+    python benchmarks/load_test.py --total 2000 --max-rps 6 --truncate-rate 0.05
+    python benchmarks/load_test.py --total 2000 --view tickers
+    python benchmarks/load_test.py --url http://127.0.0.1:8765/screener.ashx?v=111
+
+Without --url the stand-in is started in-process with the fault options
+below, then finviz_scraper.main() runs the stock and ETF screens against it
+and the wall time, pages/s, retries and failures are printed (and written as
+JSON with --output).
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import finviz_scraper
+import finviz_standin
+
+
+def run(stock_url, etf_url, quiet=True, view="overview"):
+    report = finviz_scraper.FetchReport()
+    out = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(out) if quiet else contextlib.nullcontext():
+        tickers = finviz_scraper.main(stock_url, etf_url, report=report, view=view)
+    wall = time.perf_counter() - start
+    return {
+        "wall_s": wall,
+        "tickers": len(tickers),
+        "pages_per_s": report.pages_ok / wall if wall else 0.0,
+        **report.as_dict(),
+    }
+
+
+def main(argv=None):
+    parser = finviz_standin.build_parser()
+    parser.description = __doc__.strip().splitlines()[0]
+    parser.set_defaults(port=0)
+    parser.add_argument("--url", help="screener URL of an already running stand-in (scraped as both screens)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--show-log", action="store_true", help="print the scraper's per-page log")
+    parser.add_argument("--view", choices=finviz_scraper.VIEWS, default="overview",
+                        help="screener view to scrape: 20-row overview pages or the 1000-symbol tickers view")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        # Screens are keyed by URL, so the two copies need different query strings to both be scraped
+        separator = "&" if "?" in args.url else "?"
+        stock_url = f"{args.url}{separator}screen=stocks"
+        etf_url = f"{args.url}{separator}screen=etf"
+    else:
+        server, state = finviz_standin.start(args)
+        base = f"http://{args.host}:{server.server_port}/screener.ashx"
+        stock_url = f"{base}?v=111&f=stocks"
+        etf_url = f"{base}?v=111&f=etf"
+
+    try:
+        results = run(stock_url, etf_url, quiet=not args.show_log, view=args.view)
+    finally:
+        if server:
+            server.shutdown()
+    if server:
+        results["server"] = dict(state.stats)
+
+    print(f"wall {results['wall_s']:.2f}s  {results['pages_ok']} pages  "
+          f"{results['pages_per_s']:.1f} pages/s  {results['tickers']} tickers")
+    print(f"retries {results['retries']} ({results['throttled']} rate-limited)  "
+          f"failed pages {len(results['errors'])}")
+    if server:
+        print("server " + "  ".join(f"{k}={v}" for k, v in results["server"].items()))
+    for error in results["errors"]:
+        print(f"  page {error['page']}: {error['message']} after {error['attempts']} attempts")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if not results["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Headless benchmark suite for the scraper, ticker list, list refresh and
+navigation hot paths.
+
+    python benchmarks/run_benchmarks.py [--quick] [--output FILE] [--compare OLD.json]
+
+Results are written as JSON (default benchmarks/results/<git commit>.json) so
+two commits can be compared with --compare. No network, display or keyboard
+hook is needed: pages come from benchmarks/fixtures and pynput is replaced by
+a fake Controller that timestamps every injected key.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stubs
+
+stubs.install()
+
+import finviz_scraper
+from bench_ticker_list import make_symbols
+from finviz_extractors import EXTRACTORS
+from state_actor import ViewSnapshot
+from ticker_list import TickerLinkedList
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def measure(fn, repeat=5):
+    """Run fn `repeat` times and return timing stats in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": min(times), "median_ms": statistics.median(times), "max_ms": max(times)}
+
+
+class FixtureSession:
+    """Serves the saved last page (#81 of 99) for r=81 and the saved first page for every other offset."""
+
+    def __init__(self, first, last):
+        self.first = first
+        self.last = last
+
+    def get(self, url, headers=None, timeout=None):
+        return FixtureResponse(self.last if url.endswith("&r=81") else self.first)
+
+
+class FixtureResponse:
+    status_code = 200
+    ok = True
+    headers = {}
+
+    def __init__(self, text):
+        self.text = text
+
+
+def bench_scraper(results, repeat):
+    pages = {os.path.basename(p): open(p, encoding="utf-8").read()
+             for p in sorted(glob.glob(os.path.join(FIXTURES, "screener_v111_*.html")))}
+    for name, html in pages.items():
+        for backend, extract in EXTRACTORS.items():
+            results[f"extract/{backend}/{name}"] = measure(lambda: extract(html), repeat * 20)
+
+    session = FixtureSession(pages["screener_v111_first.html"], pages["screener_v111_last.html"])
+    original = finviz_scraper._new_session
+    finviz_scraper._new_session = lambda: session
+    try:
+        for backend in EXTRACTORS:
+            results[f"get_finviz_tickers/{backend}"] = measure(
+                lambda: finviz_scraper.get_finviz_tickers("https://finviz.test/screener.ashx?v=111",
+                                                          max_rate=1e6, extractor=backend), repeat)
+    finally:
+        finviz_scraper._new_session = original
+
+
+def bench_ticker_list(results, sizes, repeat):
+    for size in sizes:
+        symbols = make_symbols(size)
+        probe = random.Random(2).sample(symbols, min(1000, size))
+        ring = TickerLinkedList(symbols)
+        results[f"ticker_list/{size}/build"] = measure(lambda: TickerLinkedList(symbols), repeat)
+        results[f"ticker_list/{size}/find_1000"] = measure(lambda: [ring.find(s) for s in probe], repeat)
+        prefixes = [s[:2] for s in probe]
+        snapshot = ViewSnapshot(1, sorted(symbols))
+        results[f"snapshot/{size}/complete_1000"] = measure(lambda: [snapshot.complete(p) for p in prefixes], repeat)
+        results[f"snapshot/{size}/publish_full"] = measure(lambda: ViewSnapshot(2, sorted(symbols)), repeat)
+        hidden = probe[:100]
+        shown = snapshot.patched(removed=hidden)
+        results[f"snapshot/{size}/patch_100"] = measure(lambda: shown.patched(added=hidden), repeat)
+
+        def remove_insert():
+            for s in probe:
+                ring.remove(s)
+            for s in probe:
+                ring.insert_sorted(s)
+        results[f"ticker_list/{size}/remove_insert_1000"] = measure(remove_insert, repeat)
+
+
+def bench_screener_query(results, sizes, repeat):
+    try:
+        from screener_columns import ScreenerColumns, parse_query
+    except ImportError:
+        print("NumPy not installed, skipping screener_query")
+        return
+    rng = random.Random(7)
+    query = parse_query("volume > 5M, sort by change desc")
+    for size in sizes:
+        symbols = make_symbols(size, seed=8)
+        rows = [{"Ticker": s, "Sector": rng.choice(["Technology", "Healthcare", "Energy"]),
+                 "Price": f"{rng.uniform(1, 500):.2f}", "Change": f"{rng.uniform(-8, 8):.2f}%",
+                 "Volume": f"{rng.randint(0, 10**8):,}"} for s in symbols]
+        results[f"screener_query/{size}/build"] = measure(lambda: ScreenerColumns.from_rows(rows), repeat)
+        data = ScreenerColumns.from_rows(rows)
+        visible = sorted(symbols)
+        results[f"screener_query/{size}/filter_sort"] = measure(lambda: data.query(visible, *query), repeat)
+
+
+def bench_update_ticker_list(results, sizes, repeat):
+    for size in sizes:
+        symbols = make_symbols(size * 2, seed=3)
+        original, fetched = symbols[::2], symbols[1::2]
+        blacklist = random.Random(4).sample(symbols, size // 20)
+        with tempfile.TemporaryDirectory() as tmp:
+            app = stubs.headless_program(tmp, original, fetched, blacklist)
+            app.show_fetched_var.set(True)
+            app.update_ticker_list().result()
+
+            results[f"update_ticker_list/{size}/unchanged"] = measure(
+                lambda: app.update_ticker_list(full_refresh=False).result(), repeat)
+
+            def toggle():
+                app.show_fetched_var.set(not app.show_fetched_var.get())
+                app.update_ticker_list().result()
+            results[f"update_ticker_list/{size}/toggle_fetched"] = measure(toggle, repeat)
+
+            churn = set(random.Random(5).sample(fetched, max(1, size // 100)))
+            without_churn = [s for s in fetched if s not in churn]
+            def fetch_delta():
+                app.state.submit(app._set_fetched, without_churn).result()
+                app.state.submit(app._set_fetched, fetched).result()
+            app.show_fetched_var.set(True)
+            results[f"update_ticker_list/{size}/fetch_delta_1pct"] = measure(fetch_delta, repeat)
+            app.blacklist.close()
+            app.keystrokes.stop()
+            app.state.stop()
+
+
+def bench_navigation(results, presses=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = stubs.headless_program(tmp, make_symbols(1000, seed=6))
+        app.update_ticker_list().result()
+        controller = app.controller
+
+        on_press_ms = []
+        press_times = []
+        for i in range(presses):
+            key = stubs.Key.down if i % 10 else stubs.Key.up
+            start = time.perf_counter()
+            app.on_press(key)
+            on_press_ms.append((time.perf_counter() - start) * 1000)
+            press_times.append(start)
+            time.sleep(0.002)
+        app.keystrokes.wait_idle(10)
+
+        enters = [t for t, kind, key in controller.events if kind == "press" and key is stubs.Key.enter]
+        # Latency from each keypress to the next Enter that followed it
+        latencies = []
+        j = 0
+        for t in press_times:
+            while j < len(enters) and enters[j] < t:
+                j += 1
+            if j < len(enters):
+                latencies.append((enters[j] - t) * 1000)
+
+        results["navigation/on_press"] = {
+            "median_ms": statistics.median(on_press_ms), "max_ms": max(on_press_ms)}
+        results["navigation/press_to_enter"] = {
+            "median_ms": statistics.median(latencies), "max_ms": max(latencies),
+            "typed": len(enters), "coalesced": app.keystrokes.coalesced, "presses": presses}
+        app.keystrokes.stop()
+        app.blacklist.close()
+        app.state.stop()
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def compare(current, old_path):
+    with open(old_path) as f:
+        old = json.load(f)["results"]
+    print(f"\nvs {old_path}")
+    for name, stats in current.items():
+        before = old.get(name, {}).get("median_ms")
+        if before and "median_ms" in stats:
+            ratio = stats["median_ms"] / before
+            flag = "  REGRESSION" if ratio > 1.2 else ""
+            print(f"  {name:<55} {before:9.3f} -> {stats['median_ms']:9.3f} ms  x{ratio:5.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="skip the 100k-symbol sizes")
+    parser.add_argument("--output", help="JSON file to write (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    sizes = [1_000, 10_000] if args.quick else [1_000, 10_000, 100_000]
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        # The scraper prints a line per page
+        bench_scraper(results, args.repeat)
+    bench_ticker_list(results, sizes, args.repeat)
+    bench_screener_query(results, sizes, args.repeat)
+    bench_update_ticker_list(results, sizes, args.repeat)
+    bench_navigation(results)
+
+    for name, stats in results.items():
+        print(f"{name:<55} " + "  ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+                                          for k, v in stats.items()))
+
+    commit = git_commit()
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"commit": commit, "python": platform.python_version(),
+                   "platform": platform.platform(), "created": time.time(),
+                   "results": results}, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Headless stand-ins so stocks.TypingProgram can be benchmarked without a
+display or keyboard hook. install() must run before stocks is imported.
+"""
+import sys
+import threading
+import time
+import types
+
+
+class FakeKey:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"Key.{self.name}"
+
+
+class Key:
+    down = FakeKey("down")
+    up = FakeKey("up")
+    left = FakeKey("left")
+    right = FakeKey("right")
+    enter = FakeKey("enter")
+    cmd = FakeKey("cmd")
+    ctrl_l = FakeKey("ctrl_l")
+    f2 = FakeKey("f2")
+    esc = FakeKey("esc")
+    backspace = FakeKey("backspace")
+
+
+class FakeController:
+    """Records every injected key with a perf_counter timestamp."""
+
+    def __init__(self):
+        self.events = []
+
+    def type(self, char):
+        self.events.append((time.perf_counter(), "type", char))
+
+    def press(self, key):
+        self.events.append((time.perf_counter(), "press", key))
+
+    def release(self, key):
+        self.events.append((time.perf_counter(), "release", key))
+
+
+class FakeListener:
+    def __init__(self, on_press=None):
+        self.on_press = on_press
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class FakeVar:
+    def __init__(self, value=False):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class FakeView:
+    def __init__(self):
+        self.symbols = []
+        self.rows = []
+
+    def set_symbols(self, symbols):
+        self.symbols = symbols
+
+    def see(self, symbol):
+        pass
+
+
+class FakeRoot:
+    def after(self, delay, fn=None):
+        return None
+
+    def after_cancel(self, job):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+
+def install():
+    """Replace pynput with recording fakes, and customtkinter too if it isn't installed."""
+    keyboard = types.ModuleType("pynput.keyboard")
+    keyboard.Key = Key
+    keyboard.Controller = FakeController
+    keyboard.Listener = FakeListener
+    pynput = types.ModuleType("pynput")
+    pynput.keyboard = keyboard
+    sys.modules["pynput"] = pynput
+    sys.modules["pynput.keyboard"] = keyboard
+
+    try:
+        import customtkinter  # noqa: F401 - imports fine without a display
+    except ImportError:
+        ctk = types.ModuleType("customtkinter")
+        ctk.CTkFrame = object
+        sys.modules["customtkinter"] = ctk
+
+
+def headless_program(base_path, original=(), fetched=(), blacklist=()):
+    """Build a TypingProgram with its state filled in but no window or keyboard hook."""
+    import stocks
+    from blacklist_store import BlacklistStore
+    from keystroke_engine import KeystrokeEngine
+    from ticker_list import TickerLinkedList
+    from write_behind import WriteBehindWriter
+
+    stocks.load_gui_modules()
+    app = stocks.TypingProgram.__new__(stocks.TypingProgram)
+    app.base_path = base_path
+    app.original_file = f"{base_path}/original.txt"
+    app.fetched_file = f"{base_path}/fetched.txt"
+    app.blacklist_file = f"{base_path}/blacklist.txt"
+    with open(app.blacklist_file, "w") as f:
+        f.writelines(s + "\n" for s in blacklist)
+    app.db = None
+    app.blacklist = BlacklistStore(app.blacklist_file)
+    app.original_ticker_symbols = TickerLinkedList(sorted(original))
+    app.watchlist_lock = threading.RLock()
+    app.original_writer = WriteBehindWriter(lambda: None)
+    app.fetched_tickers = sorted(fetched)
+    app.history_filter = None
+    app.row_query = ""
+    app.row_query_sorted = False
+    app.controller = FakeController()
+    app.shortcut_key = Key.ctrl_l
+    app.jump_key = Key.f2
+    app._jump_buffer = None
+    app.keystrokes = KeystrokeEngine(app.controller, Key.enter, Key.ctrl_l)
+    app.root = FakeRoot()
+    app.ticker_view = FakeView()
+    app.show_fetched_var = FakeVar(False)
+    app.force_refresh_var = FakeVar(False)
+    app._init_state()
+    return app
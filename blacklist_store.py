@@ -0,0 +1,107 @@
+import os
+import threading
+import metrics
+from write_behind import WriteBehindWriter
+
+
+class BlacklistStore:
+    """
+    In-memory blacklist backed by blacklist.txt plus an append-only journal.
+
+    Membership checks never touch disk. add() appends the new symbols to
+    `<path>.journal`, and a WriteBehindWriter folds the journal into the
+    sorted blacklist file `compact_delay` seconds after the last change.
+    Compaction rotates the journal to `.journal.old` first, so adds are never
+    blocked by the rewrite; load replays both journals after a crash.
+    `symbols` skips the load when the caller already has the set (warm start).
+    """
+
+    def __init__(self, path, compact_delay=2.0, symbols=None):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.old_journal_path = self.journal_path + ".old"
+        self.compact_delay = compact_delay
+        self._symbols = set()
+        self._lock = threading.Lock()
+        self._compactor = WriteBehindWriter(self.compact, compact_delay, name="blacklist-compactor")
+        if symbols is None:
+            self.load()
+        else:
+            self._symbols = set(symbols)
+
+    def _read(self, path):
+        if not os.path.exists(path):
+            return set()
+        with open(path, "r") as f:
+            return {line.strip().upper() for line in f if line.strip()}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            open(self.path, "a").close()
+        symbols = self._read(self.path)
+        pending = self._read(self.old_journal_path) | self._read(self.journal_path)
+        with self._lock:
+            self._symbols = symbols | pending
+        if pending - symbols:
+            self._compactor.mark_dirty()
+
+    def __contains__(self, symbol):
+        return symbol in self._symbols
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def snapshot(self):
+        with self._lock:
+            return frozenset(self._symbols)
+
+    def add(self, tickers):
+        """Blacklist one symbol or an iterable of symbols. Returns the symbols that were new."""
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        with self._lock:
+            new = {t.strip().upper() for t in tickers if t and t.strip()} - self._symbols
+            if not new:
+                return set()
+            self._symbols.update(new)
+            with metrics.timer("blacklist.journal_append"), open(self.journal_path, "a") as journal:
+                for symbol in sorted(new):
+                    journal.write(symbol + "\n")
+        self._compactor.mark_dirty()
+        return new
+
+    def _rotate_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        if not os.path.exists(self.old_journal_path):
+            os.replace(self.journal_path, self.old_journal_path)
+            return
+        # A previous compaction failed; keep its entries and add the new ones
+        with open(self.journal_path, "r") as src, open(self.old_journal_path, "a") as dst:
+            dst.write(src.read())
+        os.remove(self.journal_path)
+
+    def compact(self):
+        """Rewrite the sorted blacklist file from memory and drop the folded journal."""
+        with self._lock:
+            symbols = sorted(self._symbols)
+            self._rotate_journal()
+
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                for symbol in symbols:
+                    f.write(symbol + "\n")
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"Failed to compact blacklist: {e}")
+            return
+        if os.path.exists(self.old_journal_path):
+            os.remove(self.old_journal_path)
+
+    def close(self):
+        """Run the pending compaction now, e.g. on shutdown."""
+        self._compactor.flush()
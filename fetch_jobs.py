@@ -0,0 +1,101 @@
+import threading
+from concurrent.futures import CancelledError, Future, wait
+
+
+class FetchJob:
+    """
+    One fetch of a screener set (the key, e.g. a tuple of (name, url)
+    pairs), as handed out by FetchJobManager. Callers that asked for the same fetch while it was
+    running share the job: `requests` counts them, `background` stays True
+    only if every one of them was a scheduled refresh, and `force_refresh`
+    is set if any of them asked to skip the cache before it started.
+    """
+
+    def __init__(self, key, force_refresh=False, background=False):
+        self.key = key
+        self.force_refresh = force_refresh
+        self.background = background
+        self.requests = 1
+        self.progress = (0, 0)
+        self.cancelled = threading.Event()
+        self.future = Future()
+        self.started = False
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def done(self):
+        return self.future.done()
+
+    def wait(self, timeout=None):
+        """The job's result, or None if it was cancelled or failed."""
+        try:
+            return self.future.result(timeout)
+        except (CancelledError, Exception):
+            return None
+
+
+class FetchJobManager:
+    """
+    Runs at most one screener fetch at a time, on its own daemon thread.
+
+    request() for the screener set of the running job joins that job
+    instead of starting another scrape. A request for a different set cancels the
+    running job and starts once it has stopped, so two scrapes never race
+    on fetched.txt. `run(job)` does the fetch; it should pass job.cancelled
+    down to Watchlist.fetch and store page counts in job.progress.
+    """
+
+    def __init__(self, run, name="fetch"):
+        self.run = run
+        self.name = name
+        self.current = None
+        self.merged = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def request(self, key, force_refresh=False, background=False):
+        """The job fetching `key`, started if needed."""
+        with self._lock:
+            previous = self.current
+            if previous and not previous.done():
+                if previous.key == key and not previous.cancelled.is_set():
+                    self.merged += 1
+                    previous.requests += 1
+                    previous.background = previous.background and background
+                    if not previous.started:
+                        previous.force_refresh = previous.force_refresh or force_refresh
+                    return previous
+                self._cancel(previous)
+            job = FetchJob(key, force_refresh, background)
+            self.current = job
+        threading.Thread(target=self._run, args=(job, previous), name=self.name, daemon=True).start()
+        return job
+
+    def cancel(self, keep=None):
+        """Cancel the running job, unless it is fetching `keep`."""
+        with self._lock:
+            job = self.current
+            if job and not job.done() and job.key != keep:
+                self._cancel(job)
+
+    def _cancel(self, job):
+        if not job.cancelled.is_set():
+            job.cancel()
+            self.cancelled += 1
+            print(f"{self.name}: cancelling a fetch that is no longer wanted")
+
+    def _run(self, job, previous):
+        if previous:
+            # A cancelled scrape stops within a page; wait so the two never overlap
+            wait([previous.future])
+        if job.cancelled.is_set() or not job.future.set_running_or_notify_cancel():
+            job.future.cancel()
+            return
+        job.started = True
+        try:
+            result = self.run(job)
+        except Exception as e:
+            job.future.set_exception(e)
+        else:
+            job.future.set_result(result)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+class CacheEntry:
+    def __init__(self, url, body, etag=None, last_modified=None, fetched_at=0.0, fresh=False):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.fresh = fresh
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Persistent cache of screener page bodies keyed by the paged URL.
+
+    Entries younger than `ttl` seconds are served without a request. Older
+    entries keep their ETag/Last-Modified so the caller can revalidate them
+    with a conditional GET. When the bodies add up to more than `max_bytes`
+    the least recently used ones are evicted.
+    """
+
+    def __init__(self, directory, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(directory, 'index.json')
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose body file has gone missing
+        return {url: meta for url, meta in index.items()
+                if os.path.exists(self._body_path(meta['key']))}
+
+    def _save_index(self):
+        tmp = self.index_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self.index_file)
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, key + '.html')
+
+    def get(self, url):
+        """Return a CacheEntry for url (fresh or stale), or None if nothing is cached."""
+        with self._lock:
+            meta = self._index.get(url)
+            if not meta:
+                return None
+            try:
+                with open(self._body_path(meta['key']), 'r', encoding='utf-8') as f:
+                    body = f.read()
+            except OSError:
+                self._index.pop(url, None)
+                return None
+            now = time.time()
+            meta['last_used'] = now
+            return CacheEntry(url, body, meta.get('etag'), meta.get('last_modified'),
+                              meta['fetched_at'], now - meta['fetched_at'] < self.ttl)
+
+    def put(self, url, body, etag=None, last_modified=None):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        data = body.encode('utf-8')
+        with self._lock:
+            tmp = self._body_path(key) + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self._body_path(key))
+            now = time.time()
+            self._index[url] = {
+                'key': key,
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': now,
+                'last_used': now,
+                'size': len(data),
+            }
+            self._evict()
+            self._save_index()
+
+    def touch(self, url):
+        """Mark a stale entry fresh again after the server answered 304 Not Modified."""
+        with self._lock:
+            meta = self._index.get(url)
+            if meta:
+                meta['fetched_at'] = meta['last_used'] = time.time()
+                self._save_index()
+
+    def clear(self):
+        with self._lock:
+            for meta in self._index.values():
+                try:
+                    os.remove(self._body_path(meta['key']))
+                except OSError:
+                    pass
+            self._index = {}
+            self._save_index()
+
+    def _evict(self):
+        total = sum(meta['size'] for meta in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for url, meta in sorted(self._index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._body_path(meta['key']))
+            except OSError:
+                pass
+            total -= meta['size']
+            del self._index[url]
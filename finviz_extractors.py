@@ -0,0 +1,175 @@
+import html as htmllib
+import re
+from html.parser import HTMLParser
+
+# Pluggable backends that pull ticker symbols out of a Finviz screener page.
+# "scan" and "stream" only look at the screener_table slice of the page, "bs4"
+# parses the whole document with BeautifulSoup and is kept as a fallback.
+
+TICKER_COLUMN = 1
+
+# Column headers of the v=111 "Overview" table, used when a page has no <thead>
+OVERVIEW_HEADER = ("No.", "Ticker", "Company", "Sector", "Industry", "Country",
+                   "Market Cap", "P/E", "Price", "Change", "Volume")
+
+_TABLE_START = re.compile(r'<table\b[^>]*\bclass="[^"]*\bscreener_table\b')
+_DATA_ROW = re.compile(r'<tr\b[^>]*\bvalign="top"[^>]*>(.*?)</tr>', re.S)
+_CELL = re.compile(r'<td\b[^>]*>(.*?)</td>', re.S)
+_HEADER_CELL = re.compile(r'<th\b[^>]*>(.*?)</th>', re.S)
+_TAG = re.compile(r'<[^>]*>')
+_QUOTE_LINK = re.compile(r'quote\.ashx\?t=([^&"\'\s]+)')
+
+
+def screener_table_slice(html):
+    """Return just the <table ...screener_table...>...</table> markup, or None if the page has no table."""
+    match = _TABLE_START.search(html)
+    if not match:
+        return None
+    start = match.start()
+
+    # Walk forward to the matching </table>, allowing for nested tables
+    depth = 0
+    pos = start
+    while True:
+        next_open = html.find('<table', pos)
+        next_close = html.find('</table', pos)
+        if next_close == -1:
+            return html[start:]
+        if next_open != -1 and next_open < next_close:
+            depth += 1
+            pos = next_open + 6
+        else:
+            depth -= 1
+            pos = next_close + 7
+            if depth == 0:
+                end = html.find('>', pos)
+                return html[start:end + 1 if end != -1 else len(html)]
+
+
+class ScreenerTableParser(HTMLParser):
+    """Streams the screener table and keeps the text of one column for every data row."""
+
+    def __init__(self, column=TICKER_COLUMN):
+        super().__init__(convert_charrefs=True)
+        self.column = column
+        self.values = []
+        self._table_depth = 0
+        self._in_row = False
+        self._cell_index = -1
+        self._in_cell = False
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self._table_depth += 1
+        elif self._table_depth != 1:
+            return
+        elif tag == 'tr':
+            self._in_row = ('valign', 'top') in attrs
+            self._cell_index = -1
+        elif tag == 'td' and self._in_row:
+            self._cell_index += 1
+            self._in_cell = self._cell_index == self.column
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == 'table':
+            self._table_depth -= 1
+        elif self._table_depth != 1:
+            return
+        elif tag == 'td' and self._in_cell:
+            self.values.append(''.join(self._text).strip())
+            self._in_cell = False
+        elif tag == 'tr':
+            self._in_row = False
+            self._in_cell = False
+
+    def handle_data(self, data):
+        if self._in_cell:
+            self._text.append(data)
+
+
+def extract_tickers_scan(html):
+    table = screener_table_slice(html)
+    if table is None:
+        return []
+    tickers = []
+    for row in _DATA_ROW.finditer(table):
+        cells = _CELL.findall(row.group(1))
+        if len(cells) > TICKER_COLUMN:
+            tickers.append(htmllib.unescape(_TAG.sub('', cells[TICKER_COLUMN])).strip())
+    return tickers
+
+
+def extract_rows_scan(html):
+    """Every data row of the screener table as a {column header: cell text} dict."""
+    table = screener_table_slice(html)
+    if table is None:
+        return []
+    header = [htmllib.unescape(_TAG.sub('', th)).strip() for th in _HEADER_CELL.findall(table)]
+    header = header or OVERVIEW_HEADER
+    rows = []
+    for row in _DATA_ROW.finditer(table):
+        cells = _CELL.findall(row.group(1))
+        if len(cells) > TICKER_COLUMN:
+            rows.append({name: htmllib.unescape(_TAG.sub('', cell)).strip() for name, cell in zip(header, cells)})
+    return rows
+
+
+def extract_tickers_compact(html):
+    """
+    Tickers of a v=411 "Tickers" view page. That view has no rows: every
+    symbol is a quote link in one cell, up to 1000 per page.
+    """
+    region = screener_table_slice(html)
+    if region is None:
+        start = html.find('screener-tickers')
+        if start == -1:
+            return []
+        region = html[start:html.find('</td>', start)]
+    tickers = []
+    seen = set()
+    for match in _QUOTE_LINK.finditer(region):
+        ticker = htmllib.unescape(match.group(1)).strip().upper()
+        if ticker and ticker not in seen:
+            seen.add(ticker)
+            tickers.append(ticker)
+    return tickers
+
+
+def extract_tickers_stream(html):
+    table = screener_table_slice(html)
+    if table is None:
+        return []
+    parser = ScreenerTableParser()
+    parser.feed(table)
+    parser.close()
+    return parser.values
+
+
+def extract_tickers_bs4(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = soup.select('table.screener_table tr[valign="top"]')
+
+    tickers = []
+    for row in rows:
+        cols = row.select('td')
+        if cols and len(cols) > 1:
+            tickers.append(cols[1].text.strip())
+    return tickers
+
+
+EXTRACTORS = {
+    'scan': extract_tickers_scan,
+    'stream': extract_tickers_stream,
+    'bs4': extract_tickers_bs4,
+}
+
+
+def get_extractor(name):
+    try:
+        return EXTRACTORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown extractor '{name}', expected one of {sorted(EXTRACTORS)}")
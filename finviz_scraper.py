@@ -1,57 +1,446 @@
 import requests
-from bs4 import BeautifulSoup
 import time
 import os
+import queue
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from finviz_extractors import extract_rows_scan, extract_tickers_bs4, extract_tickers_compact, get_extractor
+from rate_limiter import AdaptiveRateLimiter, RetryPolicy, parse_retry_after
 
-def get_finviz_tickers(url, output_file=None):
+PAGE_SIZE = 20
+# The v=411 "Tickers" view lists symbols only, 1000 to a page instead of 20 rows
+TICKERS_PAGE_SIZE = 1000
+VIEWS = ('overview', 'tickers')
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                  'AppleWebKit/537.36 (KHTML, like Gecko) '
+                  'Chrome/134.0.0.0 Safari/537.36',
+    'Referer': 'https://finviz.com/',
+}
+
+# "#1 / 437 Total" on the current layout, "Total: </b>437" on the older one
+_TOTAL_PATTERNS = (
+    re.compile(r'#\d+\s*/\s*(\d+)\s*Total'),
+    re.compile(r'Total:\s*(?:</b>)?\s*(\d+)'),
+)
+
+
+class PageFetchError(Exception):
+    """A screener page that still failed after the retry cap was reached."""
+
+    def __init__(self, page, url, attempts, status=None, message=""):
+        super().__init__(f"page {page} failed after {attempts} attempts: {message}")
+        self.page = page
+        self.url = url
+        self.attempts = attempts
+        self.status = status
+        self.message = message
+
+
+class IncompletePageError(ValueError):
+    """A page parsed to fewer rows than the screener total says it must have, e.g. truncated HTML."""
+
+
+class LayoutChangedError(Exception):
+    """The first page of the tickers view parsed to nothing: the v=411 layout isn't what we read any more."""
+
+
+class FetchCancelled(Exception):
+    """The caller set the `cancel` event while a scrape was running."""
+
+
+def expected_rows(total, page, page_size=PAGE_SIZE):
+    if total is None:
+        return None
+    return max(0, min(page_size, total - (page - 1) * page_size))
+
+
+class FetchReport:
     """
-    Fetch tickers from a Finviz screener URL.
-    If output_file is provided (str), write the tickers to that file.
-    Otherwise, return the list and do not write any file.
+    Collects retry, throttling and failure counts across all pages of a scrape.
+
+    on_progress(done, total) is called from the fetching threads whenever a
+    page finishes (fetched or given up on) or more pages become known.
     """
+
+    def __init__(self, on_progress=None):
+        self.pages_ok = 0
+        self.pages_total = 0
+        self.retries = 0
+        self.throttled = 0
+        self.errors = []
+        self.screeners = {}
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+
+    @property
+    def pages_done(self):
+        return self.pages_ok + len(self.errors)
+
+    def _progress(self):
+        if self.on_progress:
+            self.on_progress(self.pages_done, max(self.pages_total, self.pages_done))
+
+    def add_pages(self, count):
+        with self._lock:
+            self.pages_total += count
+        self._progress()
+
+    def record_ok(self):
+        with self._lock:
+            self.pages_ok += 1
+        self._progress()
+
+    def record_retry(self, throttled=False):
+        with self._lock:
+            self.retries += 1
+            if throttled:
+                self.throttled += 1
+
+    def record_error(self, error):
+        with self._lock:
+            self.errors.append(error)
+        self._progress()
+
+    def record_screener(self, name, url, tickers, seconds):
+        with self._lock:
+            self.screeners[name] = {'url': url, 'tickers': tickers, 'seconds': seconds}
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def as_dict(self):
+        return {
+            'pages_ok': self.pages_ok,
+            'pages_total': self.pages_total,
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'errors': [{'page': e.page, 'url': e.url, 'attempts': e.attempts,
+                        'status': e.status, 'message': e.message} for e in self.errors],
+            'screeners': dict(self.screeners),
+        }
+
+    def summary(self):
+        text = f"{self.pages_ok} pages fetched, {self.retries} retries ({self.throttled} rate-limited)"
+        if self.errors:
+            failed = ", ".join(str(e.page) for e in sorted(self.errors, key=lambda e: e.page))
+            text += f", {len(self.errors)} pages failed: {failed}"
+        return text
+
+
+def paged_url(url, page, page_size=PAGE_SIZE):
+    return f"{url}&r={1 + (page - 1) * page_size}"
+
+
+def tickers_view_url(url):
+    """The same screen in the v=411 "Tickers" view: same filters and order, symbols only."""
+    if re.search(r'([?&])v=\d+', url):
+        return re.sub(r'([?&])v=\d+', r'\g<1>v=411', url, count=1)
+    return url + ('&' if '?' in url else '?') + 'v=411'
+
+
+def parse_total(html):
+    """Return the total result count shown on a screener page, or None if it can't be found."""
+    for pattern in _TOTAL_PATTERNS:
+        match = pattern.search(html)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def extract_tickers(html, extractor='scan'):
+    """Pull the tickers out of a screener page, falling back to BeautifulSoup if the fast path finds none."""
+    tickers = get_extractor(extractor)(html)
+    if not tickers and extractor != 'bs4' and 'screener_table' in html:
+        tickers = extract_tickers_bs4(html)
+    return tickers
+
+
+def parse_page(html, kind='tickers', extractor='scan', with_total=False):
+    """
+    Parse one screener page. kind is 'tickers' (symbols from the overview
+    table), 'rows' (overview row dicts) or 'compact' (symbols from the v=411
+    view). With with_total, returns (items, total result count or None).
+    Module level so a ProcessPoolExecutor can run it.
+    """
+    if kind == 'compact':
+        items = extract_tickers_compact(html)
+    elif kind == 'rows':
+        items = extract_rows_scan(html)
+    else:
+        items = extract_tickers(html, extractor)
+    return (items, parse_total(html)) if with_total else items
+
+
+def _new_session():
     session = requests.Session()
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                      'AppleWebKit/537.36 (KHTML, like Gecko) '
-                      'Chrome/134.0.0.0 Safari/537.36',
-        'Referer': 'https://finviz.com/',
-    }
-
-    tickers = []
-    page = 1
-    delay = 0.1
-    backoff = 10
-
-    while True:
-        paged_url = f"{url}&r={1 + (page - 1) * 20}"
-        time.sleep(delay)
+    session.headers.update(HEADERS)
+    return session
 
+
+def _fetch_page(session, url, page, limiter, retry, report, cache=None, force_refresh=False, parse=None,
+                cancel=None, page_size=PAGE_SIZE):
+    """
+    Fetch one screener page and return the HTML, or parse(html) if parse is given.
+
+    Request errors, 429s, 5xx responses and pages that parse raises
+    IncompletePageError for are retried with backoff up to retry.max_retries
+    times, then PageFetchError is raised. A 429 slows the shared limiter
+    down and its Retry-After header is honoured. Incomplete pages are never
+    cached.
+
+    With a cache, a fresh entry is returned without a request and a stale one
+    is revalidated with a conditional GET. force_refresh skips the lookup but
+    still stores the new response.
+
+    Setting `cancel` (a threading.Event) raises FetchCancelled before the
+    next attempt, and cuts a retry backoff or rate-limit wait short.
+    """
+    parse = parse or (lambda html: html)
+    started = time.perf_counter()
+    target = paged_url(url, page, page_size)
+    entry = cache.get(target) if cache and not force_refresh else None
+    if entry and entry.fresh:
+        try:
+            with metrics.timer("finviz.parse"):
+                result = parse(entry.body)
+        except IncompletePageError:
+            entry = None
+        else:
+            print(f"Cache hit for page {page}")
+            metrics.count("finviz.cache_hits")
+            report.record_ok()
+            return result
+    conditional = entry.conditional_headers() if entry else {}
+
+    status = None
+    message = ""
+    for attempt in range(retry.max_retries + 1):
+        if cancel is not None and cancel.is_set():
+            raise FetchCancelled(f"page {page} of {url}")
+        with metrics.timer("finviz.rate_limit_wait"):
+            limiter.wait(cancel)
+        if cancel is not None and cancel.is_set():
+            raise FetchCancelled(f"page {page} of {url}")
+        request_started = time.perf_counter()
         try:
-            res = session.get(paged_url, headers=headers, timeout=10)
+            res = session.get(target, headers=conditional, timeout=10)
         except requests.RequestException as e:
+            metrics.count("finviz.request_errors")
+            status, message = None, str(e)
+            delay = retry.delay(attempt)
             print(f"Request error on page {page}: {e}")
-            time.sleep(backoff)
-            continue
+        else:
+            metrics.observe("finviz.request", time.perf_counter() - request_started)
+            status = res.status_code
+            if status == 429:
+                metrics.count("finviz.throttled")
+                retry_after = parse_retry_after(res.headers.get('Retry-After'))
+                limiter.on_throttle(retry_after, max_pause=retry.max_delay)
+                message = "rate-limited"
+                delay = retry.delay(attempt, retry_after)
+                print(f"Rate-limited on page {page}, backing off {delay:.1f}s...")
+            elif status >= 500:
+                metrics.count("finviz.server_errors")
+                message = f"server error {status}"
+                delay = retry.delay(attempt)
+                print(f"Server error {status} on page {page}")
+            else:
+                limiter.on_success()
+                body = entry.body if status == 304 and entry else res.text
+                try:
+                    with metrics.timer("finviz.parse"):
+                        result = parse(body)
+                except IncompletePageError as e:
+                    metrics.count("finviz.incomplete_pages")
+                    message = f"incomplete page: {e}"
+                    delay = retry.delay(attempt)
+                    conditional = {}
+                    print(f"Incomplete page {page}: {e}")
+                else:
+                    report.record_ok()
+                    metrics.count("finviz.pages")
+                    # Wall time of the page, including rate-limit waits and retries
+                    metrics.observe("finviz.page", time.perf_counter() - started)
+                    if status == 304 and entry:
+                        cache.touch(target)
+                    elif cache and res.ok:
+                        cache.put(target, res.text, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+                    return result
+
+        if attempt < retry.max_retries:
+            report.record_retry(throttled=status == 429)
+            metrics.count("finviz.retries")
+            if cancel is not None:
+                cancel.wait(delay)
+            else:
+                time.sleep(delay)
+
+    metrics.count("finviz.failed_pages")
+    raise PageFetchError(page, target, retry.max_retries + 1, status, message)
+
+
+def iter_finviz_tickers(url, workers=4, max_rate=8.0, extractor='scan', cache=None, force_refresh=False,
+                        retry=None, report=None, rows=False, cancel=None, view='overview', limiter=None, parser=None):
+    """
+    Yield the tickers of a Finviz screener URL one page at a time, in screener
+    order, as soon as each page is available. Tickers already yielded by an
+    earlier page are dropped, so a page may yield an empty list.
+
+    The first page tells us the total result count, so the remaining pages are
+    fetched by a pool of `workers` threads sharing an AdaptiveRateLimiter that
+    never exceeds `max_rate` requests per second. workers=1 fetches the pages
+    one at a time.
+
+    Pages that still fail after `retry` (a RetryPolicy) are skipped and
+    recorded in `report` (a FetchReport), so the caller gets partial results
+    instead of a scrape that never finishes.
+    `extractor` picks the HTML backend from finviz_extractors.EXTRACTORS.
+    `cache` is an optional finviz_cache.ResponseCache; force_refresh bypasses it.
+    With rows=True each page is a list of {column header: cell text} dicts
+    (finviz_extractors.extract_rows_scan) instead of ticker strings.
+    Setting `cancel` (a threading.Event) stops the scrape: the generator
+    raises FetchCancelled once the pages in flight have stopped.
+
+    view='tickers' reads the screen through the v=411 "Tickers" view, 1000
+    symbols per request instead of 20, so a 1,000-result screen is one
+    request instead of 50. It has no columns, so rows=True always uses the
+    overview table. If the first tickers page parses to nothing (and doesn't
+    say the screen is empty) we switch to the overview pages at once; if it
+    keeps parsing short we switch after the retries.
+
+    `limiter` shares an AdaptiveRateLimiter with other scrapes running at
+    the same time. `parser` is an optional executor the HTML parsing is
+    handed to (see parse_page), e.g. a ProcessPoolExecutor.
+    """
+    if view not in VIEWS:
+        raise ValueError(f"Unknown view '{view}', expected one of {VIEWS}")
+    compact = view == 'tickers' and not rows
+    page_url = tickers_view_url(url) if compact else url
+    page_size = TICKERS_PAGE_SIZE if compact else PAGE_SIZE
+    kind = 'compact' if compact else 'rows' if rows else 'tickers'
+    limiter = limiter or AdaptiveRateLimiter(max_rate)
+    retry = retry or RetryPolicy()
+    report = report if report is not None else FetchReport()
+    local = threading.local()
+    seen = set()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = _new_session()
+        return local.session
+
+    def extract(html, with_total=False):
+        if parser is not None:
+            return parser.submit(parse_page, html, kind, extractor, with_total).result()
+        return parse_page(html, kind, extractor, with_total)
+
+    def checked(tickers, expected):
+        if expected is not None and len(tickers) < expected:
+            raise IncompletePageError(f"got {len(tickers)} of {expected} rows")
+        return tickers
+
+    def parse_first(html):
+        items, total = extract(html, with_total=True)
+        if compact and not items and total != 0:
+            # Not retried: a changed layout parses to nothing every time
+            raise LayoutChangedError(f"no tickers on page 1 of {page_url}")
+        return checked(items, expected_rows(total, 1, page_size)), total
+
+    def parse_later(page):
+        def parse(html):
+            # Screens change while we page through them (the scheduled refresh runs in market
+            # hours), so each page is checked against the total it shows itself
+            items, page_total = extract(html, with_total=True)
+            return checked(items, expected_rows(total if page_total is None else page_total, page, page_size))
+        return parse
+
+    def download(page, parse):
+        return _fetch_page(session(), page_url, page, limiter, retry, report, cache=cache,
+                           force_refresh=force_refresh, parse=parse, cancel=cancel, page_size=page_size)
+
+    def fetch(page):
+        try:
+            tickers = download(page, parse_later(page))
+        except PageFetchError as e:
+            print(f"Giving up on {e}")
+            report.record_error(e)
+            return []
+        print(f"Fetched page {page}, got {len(tickers)} tickers")
+        return tickers
+
+    def fresh(tickers):
+        new = []
+        for item in tickers:
+            ticker = item.get('Ticker') if rows else item
+            if ticker and ticker not in seen:
+                seen.add(ticker)
+                new.append(item)
+        return new
+
+    total = None
+    report.add_pages(1)
+    try:
+        first, total = download(1, parse_first)
+    except (PageFetchError, LayoutChangedError) as e:
+        if isinstance(e, LayoutChangedError) or compact and e.message.startswith("incomplete page"):
+            # Nothing parsed, or every attempt parsed short: most likely the tickers view layout changed
+            print(f"Can't read the tickers view of {url}, using the overview pages")
+            report.add_pages(-1)
+            yield from iter_finviz_tickers(url, workers, max_rate, extractor, cache, force_refresh,
+                                           retry, report, rows, cancel, limiter=limiter, parser=parser)
+            return
+        # Without the first page we don't know how many pages there are
+        print(f"Giving up on {e}")
+        report.record_error(e)
+        return
+    print(f"Fetched page 1, got {len(first)} tickers")
+    yield fresh(first)
 
-        if res.status_code == 429:
-            print(f"Rate-limited on page {page}, backing off {backoff}s...")
-            time.sleep(backoff)
-            continue
+    if total is None:
+        # No total on the page: walk until a short page, which is always the last one
+        page, last = 1, first
+        while len(last) >= page_size:
+            page += 1
+            report.add_pages(1)
+            last = fetch(page)
+            yield fresh(last)
+        return
 
-        soup = BeautifulSoup(res.text, 'html.parser')
-        rows = soup.select('table.screener_table tr[valign="top"]')
+    remaining = range(2, -(-total // page_size) + 1)
+    report.add_pages(len(remaining))
+    if workers <= 1 or len(remaining) <= 1:
+        for page in remaining:
+            yield fresh(fetch(page))
+        return
 
-        if not rows:
-            break
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(fetch, page) for page in remaining]
+        for future in futures:
+            yield fresh(future.result())
+    finally:
+        # After a cancel, wait for the pages in flight (they stop at their next attempt) so
+        # a replacement scrape never overlaps this one
+        pool.shutdown(wait=cancel is not None and cancel.is_set(), cancel_futures=True)
 
-        for row in rows:
-            cols = row.select('td')
-            if cols and len(cols) > 1:
-                ticker = cols[1].text.strip()
-                tickers.append(ticker)
 
-        print(f"Fetched page {page}, got {len(rows)} tickers")
-        page += 1
+def get_finviz_tickers(url, output_file=None, workers=4, max_rate=8.0, extractor='scan',
+                       cache=None, force_refresh=False, retry=None, report=None):
+    """
+    Fetch tickers from a Finviz screener URL.
+    If output_file is provided (str), write the tickers to that file.
+    Otherwise, return the list and do not write any file.
+
+    See iter_finviz_tickers for how pages are fetched.
+    """
+    pages = iter_finviz_tickers(url, workers, max_rate, extractor, cache, force_refresh, retry, report)
+    tickers = [t for page in pages for t in page]
 
     # Only write output_file if explicitly provided
     if output_file:
@@ -69,11 +458,98 @@ def get_finviz_tickers(url, output_file=None):
 
     return tickers
 
-def main(stock_url: str, etf_url: str) -> list:
-    stock_tickers = get_finviz_tickers(stock_url, output_file=None)
-    etf_tickers   = get_finviz_tickers(etf_url, output_file=None)
-    combined = sorted(set(stock_tickers + etf_tickers))
-    return combined
+def iter_screeners(screeners, cache=None, force_refresh=False, report=None, rows=False, cancel=None,
+                   view='overview', max_rate=8.0, workers=4, parser=None, tags=None):
+    """
+    Scrape any number of screeners at once and merge them into one stream.
+
+    `screeners` maps a name to a screener URL; a plain list of URLs is named
+    by URL. Every screen is paged on its own thread by iter_finviz_tickers,
+    all sharing one AdaptiveRateLimiter, so more screens don't mean more
+    requests per second. Yields (name, new) as pages arrive from any screen,
+    where `new` holds the tickers (or rows) no earlier page had.
+
+    If `tags` is a dict it is filled with ticker -> names of the screens
+    listing it. Each screen's ticker count and wall time go to
+    report.screeners. `parser` is passed on (see parse_page), and `cancel`
+    stops every screen; the generator returns only once they have all
+    stopped.
+    """
+    if not isinstance(screeners, dict):
+        screeners = {url: url for url in screeners}
+    report = report if report is not None else FetchReport()
+    limiter = AdaptiveRateLimiter(max_rate)
+    stop = threading.Event()
+    pages = queue.SimpleQueue()
+
+    def scrape(name, url):
+        started = time.perf_counter()
+        count = 0
+        error = None
+        try:
+            for page in iter_finviz_tickers(url, workers, cache=cache, force_refresh=force_refresh, report=report,
+                                            rows=rows, cancel=stop, view=view, limiter=limiter, parser=parser):
+                count += len(page)
+                pages.put((name, page, None))
+        except Exception as e:
+            error = e
+        report.record_screener(name, url, count, time.perf_counter() - started)
+        # None marks the end of this screen
+        pages.put((name, None, error))
+
+    threads = [threading.Thread(target=scrape, args=(name, url), name=f"screener {name}", daemon=True)
+               for name, url in screeners.items()]
+    for thread in threads:
+        thread.start()
+
+    seen = set()
+    active = len(threads)
+    try:
+        while active:
+            if cancel is not None and cancel.is_set():
+                stop.set()
+            try:
+                name, page, error = pages.get(timeout=0.25)
+            except queue.Empty:
+                continue
+            if page is None:
+                active -= 1
+                if error is not None:
+                    raise error
+                continue
+            new = []
+            for item in page:
+                ticker = item['Ticker'] if rows else item
+                if tags is not None:
+                    tags.setdefault(ticker, []).append(name)
+                if ticker not in seen:
+                    seen.add(ticker)
+                    new.append(item)
+            if new:
+                yield name, new
+    finally:
+        # Stop the other screens after an error (or the caller giving up) and wait for them
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def iter_main(*urls, cache=None, force_refresh: bool = False, report=None, with_source: bool = False,
+              rows: bool = False, cancel=None, view: str = 'overview', parser=None):
+    """
+    Yield batches of new tickers from all the screener URLs, concurrently and page by page as they arrive.
+    With with_source=True each batch comes as a (screener_url, tickers) pair.
+    With rows=True the batches hold full row dicts instead of tickers.
+    See iter_screeners for the other options.
+    """
+    for url, new in iter_screeners(urls, cache=cache, force_refresh=force_refresh, report=report, rows=rows,
+                                   cancel=cancel, view=view, parser=parser):
+        yield (url, new) if with_source else new
+
+def main(*urls, cache=None, force_refresh: bool = False, report=None, view: str = 'overview', parser=None) -> list:
+    return sorted({t for batch in iter_main(*urls, cache=cache, force_refresh=force_refresh, report=report,
+                                            view=view, parser=parser)
+                   for t in batch})
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    print("\n".join(main(*sys.argv[1:], view='tickers')))
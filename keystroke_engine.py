@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+import metrics
+
+
+class KeystrokeEngine:
+    """
+    Types into the focused window from a dedicated worker thread.
+
+    The pynput listener callback only enqueues commands, so it returns at
+    once and navigation state stays current. When several symbol commands
+    pile up while the worker is busy (holding an arrow key), only the newest
+    one is kept: the user lands on the ticker they stopped on instead of
+    replaying a backlog of stale ones. Tab commands are never dropped.
+
+    `char_delay` is the pause between characters when typing a symbol and
+    `search_char_delay` the pause used for the browser search, both in
+    seconds, so they can be tuned to what the target app keeps up with.
+    """
+
+    def __init__(self, controller, enter_key, shortcut_key, char_delay=0.0, search_char_delay=0.01):
+        self.controller = controller
+        self.enter_key = enter_key
+        self.shortcut_key = shortcut_key
+        self.char_delay = char_delay
+        self.search_char_delay = search_char_delay
+        self.coalesced = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._idle = True
+        self._worker = threading.Thread(target=self._run, name="keystrokes", daemon=True)
+        self._worker.start()
+
+    def _put(self, command, coalesce=False):
+        with self._cond:
+            if coalesce:
+                # Only trailing symbol commands are replaced, so ordering with tab commands holds
+                while self._queue and self._queue[-1][0] == "symbol":
+                    self._queue.pop()
+                    self.coalesced += 1
+                    metrics.count("keys.coalesced")
+            self._queue.append(command)
+            self._cond.notify()
+
+    def type_symbol(self, symbol):
+        """Type symbol and press Enter; supersedes any symbol still waiting to be typed."""
+        self._put(("symbol", symbol, time.perf_counter()), coalesce=True)
+
+    def search(self, text):
+        """Open a new tab, type text and press Enter."""
+        self._put(("search", text, time.perf_counter()))
+
+    def close_tab(self):
+        self._put(("close_tab", None, time.perf_counter()))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopped:
+                    self._idle = True
+                    self._cond.notify_all()
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                self._idle = False
+                kind, text, queued_at = self._queue.popleft()
+            try:
+                if kind == "symbol":
+                    self._type(text, self.char_delay)
+                elif kind == "search":
+                    self._shortcut("t")
+                    self._type(text, self.search_char_delay)
+                elif kind == "close_tab":
+                    self._shortcut("w")
+                self.on_typed(kind, text, queued_at)
+            except Exception as e:
+                print(f"Keystroke injection failed: {e}")
+
+    def on_typed(self, kind, text, queued_at):
+        """Hook called on the worker thread after each command has been typed. Records the keypress-to-typed latency."""
+        metrics.observe(f"keys.{kind}_typed", time.perf_counter() - queued_at)
+
+    def _type(self, text, delay):
+        for char in text:
+            self.controller.type(char)
+            if delay:
+                time.sleep(delay)
+        self.controller.press(self.enter_key)
+        self.controller.release(self.enter_key)
+
+    def _shortcut(self, key):
+        self.controller.press(self.shortcut_key)
+        self.controller.press(key)
+        self.controller.release(key)
+        self.controller.release(self.shortcut_key)
+
+    def wait_idle(self, timeout=None):
+        """Block until every queued command has been typed. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._idle and not self._queue, timeout)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._cond.notify_all()
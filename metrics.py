@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Count, sum, min, max and per-bucket counts of latencies in milliseconds."""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        # One more bucket for everything above the last bound
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def observe(self, ms):
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (q in 0..1), capped at max."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        labels = [f"<={bound}" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "min_ms": self.min,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max,
+            "buckets": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class Metrics:
+    """
+    Counters, gauges and latency histograms by dotted name, e.g.
+    "finviz.request" or "keys.press_to_typed". Recording takes one lock and
+    a few additions, cheap enough for every page and keypress; the stats
+    panel and `stocks.py --metrics FILE` read snapshot().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.gauges = {}
+            self.histograms = {}
+            self.since = time.time()
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds * 1000)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "since": self.since,
+                "seconds": time.time() - self.since,
+                "counters": dict(sorted(self.counters.items())),
+                "gauges": dict(sorted(self.gauges.items())),
+                "latency": {name: h.as_dict() for name, h in sorted(self.histograms.items())},
+            }
+
+    def dump(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+    def format(self):
+        """The snapshot as a fixed-width table for the stats panel."""
+        snap = self.snapshot()
+        lines = [f"{'latency (ms)':<28}{'count':>8}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"]
+        for name, h in snap["latency"].items():
+            lines.append(f"{name:<28}{h['count']:>8}" + "".join(
+                f"{h[k]:>9.2f}" for k in ("mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")))
+        lines.append("")
+        for name, value in list(snap["counters"].items()) + list(snap["gauges"].items()):
+            lines.append(f"{name:<28}{value:>8}")
+        return "\n".join(lines)
+
+
+# The process-wide registry everything records into
+METRICS = Metrics()
+count = METRICS.count
+gauge = METRICS.gauge
+observe = METRICS.observe
+timer = METRICS.timer
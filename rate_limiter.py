@@ -0,0 +1,98 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds from a Retry-After header (seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every fetch worker.
+
+    The refill rate starts at half of max_rate and creeps back up by `step`
+    requests/s after each successful response. A 429 halves it (never below
+    min_rate) and, when the server sent Retry-After, pauses every worker until
+    that time has passed (at most max_pause seconds when the caller
+    passes one).
+    """
+
+    def __init__(self, max_rate=8.0, min_rate=0.2, burst=1, step=0.5):
+        if max_rate <= 0:
+            raise ValueError("max_rate must be positive")
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.rate = max(self.min_rate, max_rate / 2)
+        self.burst = burst
+        self.step = step
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait(self, cancel=None):
+        """
+        Block until this worker may send a request. With `cancel` (a
+        threading.Event) the wait ends as soon as it is set.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Reserve a token up front; a negative balance is the queue of waiting workers
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            delay = max(delay, self._paused_until - now)
+        if delay > 0:
+            if cancel is not None:
+                cancel.wait(delay)
+            else:
+                time.sleep(delay)
+
+    def on_success(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.step)
+
+    def on_throttle(self, retry_after=None, max_pause=None):
+        """Slow down after a 429. The Retry-After pause is capped at max_pause seconds if given."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                if max_pause is not None:
+                    retry_after = min(retry_after, max_pause)
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+
+class RetryPolicy:
+    """Per-page retry cap with exponential backoff and full jitter."""
+
+    def __init__(self, max_retries=4, base_delay=1.0, max_delay=60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry number attempt + 1. A Retry-After value wins over the backoff."""
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
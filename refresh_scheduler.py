@@ -0,0 +1,126 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = Exception
+
+
+class MarketHours:
+    """
+    Weekly trading window, by default 09:30-16:00 New York time, Monday to
+    Friday. Exchange holidays are not known, so those days count as open.
+    If the time zone database is missing (Windows without the tzdata
+    package) local time is used instead.
+    """
+
+    def __init__(self, open_time="09:30", close_time="16:00", days=(0, 1, 2, 3, 4), tz="America/New_York"):
+        self.open_time = datetime.strptime(open_time, "%H:%M").time()
+        self.close_time = datetime.strptime(close_time, "%H:%M").time()
+        self.days = frozenset(days)
+        self.tz = None
+        if tz and ZoneInfo:
+            try:
+                self.tz = ZoneInfo(tz)
+            except ZoneInfoNotFoundError:
+                print(f"Time zone {tz} not available, using local time for market hours")
+
+    def now(self):
+        return datetime.now(self.tz)
+
+    def is_open(self, when=None):
+        when = when or self.now()
+        return when.weekday() in self.days and self.open_time <= when.time() < self.close_time
+
+    def seconds_until_open(self, when=None):
+        """0 while the market is open, else the seconds until the next opening."""
+        when = when or self.now()
+        if self.is_open(when):
+            return 0.0
+        for offset in range(8):
+            day = when.date() + timedelta(days=offset)
+            opening = datetime.combine(day, self.open_time, tzinfo=when.tzinfo)
+            if day.weekday() in self.days and opening > when:
+                return (opening - when).total_seconds()
+        return 24 * 60 * 60.0
+
+
+class RefreshScheduler:
+    """
+    Calls `job` every `interval` seconds (plus or minus `jitter` times the
+    interval, so runs don't line up with other clients) while `hours` says
+    the market is open, on one daemon thread.
+
+    A run is skipped, not queued, if the previous one - scheduled or started
+    with run_once() - is still going. `last_run` is the time of the data
+    already on disk, so a restart doesn't refetch what is still fresh.
+    """
+
+    def __init__(self, job, interval=15 * 60, jitter=0.1, hours=None, last_run=None, name="refresh"):
+        self.job = job
+        self.interval = interval
+        self.jitter = jitter
+        self.hours = hours
+        self.last_run = last_run
+        self.name = name
+        self.paused = False
+        self.runs = 0
+        self.skipped = 0
+        self._busy = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._busy.locked()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        """Run the job now on the calling thread. Returns False if a run was already in progress."""
+        if not self._busy.acquire(blocking=False):
+            self.skipped += 1
+            print(f"{self.name}: previous refresh still running, skipping")
+            return False
+        try:
+            self.job()
+            self.runs += 1
+        except Exception as e:
+            print(f"{self.name}: refresh failed: {e}")
+        finally:
+            self.last_run = time.time()
+            self._busy.release()
+        return True
+
+    def _jittered(self, seconds):
+        return max(0.0, seconds + random.uniform(-self.jitter, self.jitter) * self.interval)
+
+    def next_delay(self):
+        """Seconds until the next run should start."""
+        if self.hours:
+            closed_for = self.hours.seconds_until_open()
+            if closed_for:
+                return self._jittered(closed_for + self.jitter * self.interval)
+        if self.last_run is None:
+            return 0.0
+        return self._jittered(max(0.0, self.last_run + self.interval - time.time()))
+
+    def _loop(self):
+        while not self._stop.wait(self.next_delay()):
+            if self.hours and not self.hours.is_open():
+                continue
+            if self.paused:
+                # Count the skipped slot as a run so we wait a full interval again
+                self.last_run = time.time()
+                continue
+            self.run_once()
@@ -0,0 +1,196 @@
+import math
+import operator
+import os
+import re
+
+import numpy as np
+
+# Screener column header -> field name. Headers not listed here are not stored.
+HEADER_FIELDS = {
+    "Ticker": "ticker",
+    "Company": "company",
+    "Sector": "sector",
+    "Industry": "industry",
+    "Country": "country",
+    "Market Cap": "market_cap",
+    "P/E": "pe",
+    "Price": "price",
+    "Change": "change",
+    "Volume": "volume",
+}
+TEXT_FIELDS = ("ticker", "company", "sector", "industry", "country")
+NUMBER_FIELDS = ("market_cap", "pe", "price", "change", "volume")
+
+# Names accepted in a query, besides the field names themselves
+FIELD_ALIASES = {
+    "symbol": "ticker",
+    "cap": "market_cap",
+    "mcap": "market_cap",
+    "market cap": "market_cap",
+    "p/e": "pe",
+    "% change": "change",
+    "%change": "change",
+    "chg": "change",
+    "vol": "volume",
+}
+
+_SUFFIXES = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+_OPS = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+    "=": operator.eq, "==": operator.eq, "!=": operator.ne,
+}
+_CLAUSE = re.compile(r"^\s*(.+?)\s*(>=|<=|!=|==|=|>|<)\s*(.+?)\s*$")
+_SORT = re.compile(r"^\s*sort(?:ed)?\s+by\s+(.+?)(?:\s+(asc|desc|ascending|descending))?\s*$", re.I)
+_SPLIT = re.compile(r",|\s+and\s+", re.I)
+
+
+def parse_number(text):
+    """'1,234' / '5.2M' / '-1.3%' -> float; '-' or anything unparsable -> nan."""
+    text = text.strip().replace(",", "").rstrip("%")
+    if not text or text == "-":
+        return math.nan
+    scale = _SUFFIXES.get(text[-1].upper())
+    if scale:
+        text = text[:-1]
+    try:
+        return float(text) * (scale or 1)
+    except ValueError:
+        return math.nan
+
+
+def field_name(name):
+    name = name.strip().lower()
+    name = FIELD_ALIASES.get(name, name.replace(" ", "_"))
+    if name not in TEXT_FIELDS and name not in NUMBER_FIELDS:
+        raise ValueError(f"Unknown field '{name}', expected one of {', '.join(TEXT_FIELDS + NUMBER_FIELDS)}")
+    return name
+
+
+def parse_query(text):
+    """
+    Parse "volume > 5M, change > 0, sorted by change desc" into
+    ([(field, op, value), ...], (field, descending) or None). Clauses are
+    separated by commas or "and"; numbers take K/M/B/T suffixes and %.
+    """
+    filters = []
+    sort = None
+    for clause in _SPLIT.split(text or ""):
+        if not clause.strip():
+            continue
+        match = _SORT.match(clause)
+        if match:
+            sort = (field_name(match.group(1)), (match.group(2) or "").lower().startswith("desc"))
+            continue
+        match = _CLAUSE.match(clause)
+        if not match:
+            raise ValueError(f"Can't read '{clause.strip()}', expected e.g. 'volume > 5M' or 'sort by change desc'")
+        field, op, value = field_name(match.group(1)), match.group(2), match.group(3).strip("'\"")
+        if field in NUMBER_FIELDS:
+            number = parse_number(value)
+            if math.isnan(number):
+                raise ValueError(f"'{value}' is not a number")
+            filters.append((field, op, number))
+        else:
+            filters.append((field, op, value.upper() if field == "ticker" else value.lower()))
+    return filters, sort
+
+
+class ScreenerColumns:
+    """
+    Full screener rows stored column by column: one NumPy array per field,
+    every array in ticker order. Text columns are fixed-width unicode and
+    numbers float64 (nan where Finviz shows '-'), so filters and sorts over
+    a list of symbols run as array operations instead of Python loops.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.tickers = columns["ticker"]
+
+    def __len__(self):
+        return len(self.tickers)
+
+    @classmethod
+    def empty(cls):
+        return cls.from_rows([])
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from {column header: cell text} dicts as returned by extract_rows_scan. Later rows win."""
+        by_ticker = {}
+        for row in rows:
+            ticker = (row.get("Ticker") or "").strip().upper()
+            if ticker:
+                by_ticker[ticker] = row
+        tickers = sorted(by_ticker)
+        columns = {}
+        for header, field in HEADER_FIELDS.items():
+            values = [by_ticker[t].get(header, "") for t in tickers]
+            if field == "ticker":
+                columns[field] = np.array(tickers, dtype=str)
+            elif field in NUMBER_FIELDS:
+                columns[field] = np.array([parse_number(v) for v in values], dtype=np.float64)
+            else:
+                columns[field] = np.array(values, dtype=str)
+        return cls(columns)
+
+    def merge(self, newer):
+        """A new store with the rows of `newer` replacing ours for the same ticker."""
+        keep = ~np.isin(self.tickers, newer.tickers)
+        merged = {f: np.concatenate([self.columns[f][keep], newer.columns[f]]) for f in self.columns}
+        order = np.argsort(merged["ticker"], kind="stable")
+        return ScreenerColumns({f: column[order] for f, column in merged.items()})
+
+    def save(self, path):
+        # np.savez adds .npz to names that don't have it
+        tmp = path + ".tmp.npz"
+        np.savez_compressed(tmp, **self.columns)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({f: data[f] for f in data.files})
+
+    def _gather(self, field, symbols, pos, found):
+        """Values of `field` for each of `symbols`; '' or nan where we have no row."""
+        if field == "ticker":
+            return symbols
+        column = self.columns[field]
+        if field in NUMBER_FIELDS:
+            out = np.full(len(symbols), np.nan)
+        else:
+            out = np.full(len(symbols), "", dtype=column.dtype if len(column) else str)
+        out[found] = column[pos[found]]
+        return out
+
+    def query(self, symbols, filters=(), sort=None):
+        """Filter and sort `symbols` by their row data; symbols without a row fail every filter but '!='."""
+        symbols = np.asarray(list(symbols), dtype=str)
+        if not len(symbols):
+            return []
+        if len(self.tickers):
+            pos = np.minimum(np.searchsorted(self.tickers, symbols), len(self.tickers) - 1)
+            found = self.tickers[pos] == symbols
+        else:
+            pos = np.zeros(len(symbols), dtype=np.intp)
+            found = np.zeros(len(symbols), dtype=bool)
+
+        mask = np.ones(len(symbols), dtype=bool)
+        for field, op, value in filters:
+            values = self._gather(field, symbols, pos, found)
+            if field in TEXT_FIELDS and field != "ticker":
+                values = np.char.lower(values)
+            mask &= _OPS[op](values, value)
+
+        result = symbols[mask]
+        if sort:
+            field, descending = sort
+            keys = self._gather(field, symbols, pos, found)[mask]
+            if field in TEXT_FIELDS:
+                # Rank the strings so text sorts like numbers, with missing values last either way
+                _, inverse = np.unique(np.char.lower(keys), return_inverse=True)
+                keys = np.where(keys == "", np.nan, inverse.astype(np.float64))
+            order = np.argsort(-keys if descending else keys, kind="stable")
+            result = result[order]
+        return result.tolist()
@@ -0,0 +1,227 @@
+import os
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MAGIC = b"FVHIST1\n"
+_HEADER = struct.Struct("<dBI")  # fetched_at, kind, payload length
+FULL = 0
+DELTA = 1
+# msvcrt locks are mandatory, so the lock byte sits far past any record where it can't block reads
+_LOCK_OFFSET = 0x7FFFFFFF
+
+
+@contextmanager
+def _file_lock(f):
+    """Hold an exclusive lock on the open file `f` against other processes."""
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return
+    f.seek(_LOCK_OFFSET)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            break
+        except OSError:
+            # LK_LOCK gives up after about 10 s
+            pass
+    try:
+        yield
+    finally:
+        f.seek(_LOCK_OFFSET)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SnapshotHistory:
+    """
+    Append-only log of every completed fetch, so we can tell which tickers
+    entered or left the screens between runs.
+
+    Each fetch is stored as a zlib-compressed delta (+SYM / -SYM lines)
+    against the previous one, with a full checkpoint every
+    `checkpoint_every` records or whenever the delta would be bigger than
+    the snapshot itself. Record headers are uncompressed, so opening the
+    log only reads headers into an index; a query decompresses at most one
+    checkpoint and the deltas after it.
+
+    A torn record at the end (crash while appending) is cut off on load.
+    Appends take a file lock, and another process's records (the GUI's
+    refresh alongside `fetch --every`) are indexed before the next delta
+    is computed, so it is always against the real end of the log.
+    """
+
+    def __init__(self, path, checkpoint_every=100):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._times = []
+        self._offsets = []
+        self._kinds = []
+        self._latest = None
+        self._cache = {}
+        self._size = 0
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._times)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        self._scan(len(MAGIC))
+
+    def _scan(self, offset):
+        """Index the records from `offset` to the end of the file."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            self._size = 0
+            return
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a snapshot history file")
+            size = os.fstat(f.fileno()).st_size
+            f.seek(offset)
+            while offset + _HEADER.size <= size:
+                fetched_at, kind, length = _HEADER.unpack(f.read(_HEADER.size))
+                if offset + _HEADER.size + length > size:
+                    break
+                self._times.append(fetched_at)
+                self._offsets.append(offset)
+                self._kinds.append(kind)
+                offset += _HEADER.size + length
+                f.seek(offset)
+        if offset < size:
+            print(f"Dropping a torn record at the end of {os.path.basename(self.path)}")
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+        self._size = offset
+
+    def _catch_up(self, size):
+        # Writers hold the file lock here, so `size` is the real end of the log
+        if size == self._size:
+            return
+        self._latest = None
+        if self._size and size > self._size:
+            print(f"Indexing records another process added to {os.path.basename(self.path)}")
+            self._scan(self._size)
+        else:
+            self._times, self._offsets, self._kinds, self._cache = [], [], [], {}
+            self._scan(len(MAGIC))
+
+    def _read(self, f, index):
+        f.seek(self._offsets[index])
+        _, kind, length = _HEADER.unpack(f.read(_HEADER.size))
+        lines = zlib.decompress(f.read(length)).decode("ascii").split("\n") if length else []
+        return kind, [line for line in lines if line]
+
+    def _snapshot(self, index):
+        """Symbols after record `index` (-1 means before the first fetch)."""
+        if index < 0:
+            return frozenset()
+        if index in self._cache:
+            return self._cache[index]
+        start = index
+        while self._kinds[start] != FULL:
+            start -= 1
+        with open(self.path, "rb") as f:
+            symbols = set()
+            for i in range(start, index + 1):
+                kind, lines = self._read(f, i)
+                if kind == FULL:
+                    symbols = set(lines)
+                else:
+                    for line in lines:
+                        if line[0] == "+":
+                            symbols.add(line[1:])
+                        else:
+                            symbols.discard(line[1:])
+        result = frozenset(symbols)
+        # Only a couple of snapshots are ever compared at once
+        if len(self._cache) > 8:
+            self._cache.clear()
+        self._cache[index] = result
+        return result
+
+    def _append(self, f, fetched_at, kind, lines):
+        payload = zlib.compress("\n".join(lines).encode("ascii"), 9) if lines else b""
+        f.seek(0, os.SEEK_END)
+        if not self._size:
+            f.write(MAGIC)
+        offset = f.tell()
+        f.write(_HEADER.pack(fetched_at, kind, len(payload)) + payload)
+        f.flush()
+        self._size = f.tell()
+        self._times.append(fetched_at)
+        self._offsets.append(offset)
+        self._kinds.append(kind)
+
+    def record(self, symbols, fetched_at=None):
+        """Append the result of a complete fetch. Returns the (entered, exited) sets."""
+        fetched_at = fetched_at or time.time()
+        current = frozenset(s.strip().upper() for s in symbols if s and s.strip())
+        with self._lock, open(self.path, "a+b") as f, _file_lock(f):
+            self._load()
+            self._catch_up(os.fstat(f.fileno()).st_size)
+            previous = self._latest if self._latest is not None else self._snapshot(len(self._times) - 1)
+            entered, exited = current - previous, previous - current
+            since_checkpoint = 0
+            for kind in reversed(self._kinds):
+                if kind == FULL:
+                    break
+                since_checkpoint += 1
+            if not self._kinds or since_checkpoint + 1 >= self.checkpoint_every \
+                    or len(entered) + len(exited) > len(current):
+                self._append(f, fetched_at, FULL, sorted(current))
+            else:
+                self._append(f, fetched_at, DELTA, ["+" + s for s in sorted(entered)] +
+                             ["-" + s for s in sorted(exited)])
+            self._latest = current
+            self._cache[len(self._times) - 1] = current
+            return set(entered), set(exited)
+
+    def latest(self):
+        with self._lock:
+            self._load()
+            return set(self._snapshot(len(self._times) - 1))
+
+    def snapshot_at(self, when):
+        """The symbols as of the last fetch at or before `when` (empty before the first one)."""
+        with self._lock:
+            self._load()
+            return set(self._snapshot(bisect_right(self._times, when) - 1))
+
+    def last_fetch_changes(self):
+        """(entered, exited) between the last two fetches."""
+        with self._lock:
+            self._load()
+            last = len(self._times) - 1
+            after, before = self._snapshot(last), self._snapshot(last - 1)
+        return set(after - before), set(before - after)
+
+    def changes_since(self, when):
+        """(entered, exited) between the snapshot as of `when` and the latest one."""
+        with self._lock:
+            self._load()
+            after = self._snapshot(len(self._times) - 1)
+            before = self._snapshot(bisect_right(self._times, when) - 1)
+        return set(after - before), set(before - after)
+
+    def fetch_times(self):
+        with self._lock:
+            self._load()
+            return list(self._times)
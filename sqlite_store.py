@@ -0,0 +1,192 @@
+import os
+import sqlite3
+import threading
+import time
+import metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watchlist (
+    symbol   TEXT PRIMARY KEY,
+    added_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS fetched (
+    symbol     TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (symbol, source_url)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fetched_by_source ON fetched (source_url, fetched_at);
+
+CREATE TABLE IF NOT EXISTS blacklist (
+    symbol   TEXT PRIMARY KEY,
+    added_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+
+def _clean(symbols):
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    return sorted({s.strip().upper() for s in symbols if s and s.strip()})
+
+
+class SQLiteStore:
+    """
+    Single-file SQLite (WAL mode) storage for the watchlist, fetched screener
+    results and the blacklist. Every change is an incremental insert or
+    delete, and the visible list is computed by one indexed query.
+
+    The connection is shared between the Tk thread and fetch threads, so all
+    access goes through one lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _write(self, sql, rows):
+        with self._lock, metrics.timer("persist.sqlite"):
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(sql, rows)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _column(self, sql, params=()):
+        with self._lock:
+            return [row[0] for row in self.conn.execute(sql, params)]
+
+    # watchlist
+
+    def add_watchlist(self, symbols):
+        now = time.time()
+        self._write("INSERT OR IGNORE INTO watchlist (symbol, added_at) VALUES (?, ?)",
+                    [(s, now) for s in _clean(symbols)])
+
+    def remove_watchlist(self, symbols):
+        self._write("DELETE FROM watchlist WHERE symbol = ?", [(s,) for s in _clean(symbols)])
+
+    def watchlist(self):
+        return self._column("SELECT symbol FROM watchlist ORDER BY symbol")
+
+    # fetched screener results
+
+    def upsert_fetched(self, source_url, symbols, fetched_at):
+        self._write("INSERT INTO fetched (symbol, source_url, fetched_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (symbol, source_url) DO UPDATE SET fetched_at = excluded.fetched_at",
+                    [(s, source_url, fetched_at) for s in _clean(symbols)])
+
+    def prune_fetched(self, source_url, older_than):
+        """Drop tickers from source_url that were not seen by the fetch that started at older_than."""
+        with self._lock:
+            self.conn.execute("DELETE FROM fetched WHERE source_url = ? AND fetched_at < ?",
+                              (source_url, older_than))
+
+    def prune_sources(self, keep_urls):
+        """Drop fetched rows from screeners that are no longer configured."""
+        keep = list(keep_urls)
+        with self._lock:
+            self.conn.execute(f"DELETE FROM fetched WHERE source_url NOT IN ({','.join('?' * len(keep))})", keep)
+
+    def fetched_symbols(self):
+        return self._column("SELECT DISTINCT symbol FROM fetched ORDER BY symbol")
+
+    def last_fetched_at(self):
+        with self._lock:
+            return self.conn.execute("SELECT MAX(fetched_at) FROM fetched").fetchone()[0]
+
+    # blacklist
+
+    def add_blacklist(self, symbols):
+        now = time.time()
+        self._write("INSERT OR IGNORE INTO blacklist (symbol, added_at) VALUES (?, ?)",
+                    [(s, now) for s in _clean(symbols)])
+
+    def blacklist(self):
+        return self._column("SELECT symbol FROM blacklist ORDER BY symbol")
+
+    # queries
+
+    def visible_symbols(self, include_fetched=False):
+        sql = "SELECT symbol FROM watchlist"
+        if include_fetched:
+            sql += " UNION SELECT symbol FROM fetched"
+        sql = (f"SELECT symbol FROM ({sql}) "
+               "WHERE symbol NOT IN (SELECT symbol FROM blacklist) ORDER BY symbol")
+        return self._column(sql)
+
+    # one-time import
+
+    def import_text_files(self, original_file, fetched_file, blacklist_file, fetched_source="fetched.txt"):
+        """Load the plain text files into the database once. Returns False if that already happened."""
+        with self._lock:
+            done = self.conn.execute("SELECT value FROM meta WHERE key = 'imported_text_files'").fetchone()
+        if done:
+            return False
+
+        def read(path):
+            if not os.path.exists(path):
+                return []
+            with open(path, "r") as f:
+                return [line for line in f]
+
+        self.add_watchlist(read(original_file))
+        fetched = read(fetched_file)
+        if fetched:
+            self.upsert_fetched(fetched_source, fetched, os.path.getmtime(fetched_file))
+        self.add_blacklist(read(blacklist_file))
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_text_files', ?)",
+                              (str(time.time()),))
+        print(f"Imported text files into {os.path.basename(self.path)}")
+        return True
+
+
+class SQLiteBlacklist:
+    """Drop-in for BlacklistStore that keeps the set in memory and inserts new entries into SQLite."""
+
+    def __init__(self, store):
+        self.store = store
+        self._symbols = set(store.blacklist())
+        self._lock = threading.Lock()
+
+    def __contains__(self, symbol):
+        return symbol in self._symbols
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def snapshot(self):
+        with self._lock:
+            return frozenset(self._symbols)
+
+    def add(self, tickers):
+        with self._lock:
+            new = set(_clean(tickers)) - self._symbols
+            if not new:
+                return set()
+            self._symbols.update(new)
+        self.store.add_blacklist(new)
+        return new
+
+    def close(self):
+        pass
@@ -0,0 +1,247 @@
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+import metrics
+
+_STOP = object()
+
+
+# Symbols per chunk of a SortedSymbols; a chunk is split once it grows past twice this
+CHUNK = 512
+
+
+class SortedSymbols:
+    """
+    An immutable sorted sequence of symbols, stored as a tuple of chunks.
+
+    patched() copies only the chunks the added and removed symbols fall in,
+    plus the per-chunk first-symbol and offset tables. A few changes to a
+    100k list therefore copy a few hundred entries instead of the whole
+    list. Indexing and position() are two binary searches.
+    """
+
+    __slots__ = ("_chunks", "_firsts", "_offsets", "_len")
+
+    def __init__(self, chunks=()):
+        self._chunks = tuple(chunks)
+        self._firsts = [chunk[0] for chunk in self._chunks]
+        self._offsets = []
+        total = 0
+        for chunk in self._chunks:
+            self._offsets.append(total)
+            total += len(chunk)
+        self._len = total
+
+    @classmethod
+    def from_sorted(cls, symbols):
+        symbols = tuple(symbols)
+        return cls(symbols[i:i + CHUNK] for i in range(0, len(symbols), CHUNK))
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("symbol index out of range")
+        c = bisect_right(self._offsets, index) - 1
+        return self._chunks[c][index - self._offsets[c]]
+
+    def lower_bound(self, symbol):
+        """Index of the first symbol >= symbol."""
+        c = bisect_right(self._firsts, symbol) - 1
+        if c < 0:
+            return 0
+        return self._offsets[c] + bisect_left(self._chunks[c], symbol)
+
+    def position(self, symbol):
+        """Index of symbol, or None."""
+        c = bisect_right(self._firsts, symbol) - 1
+        if c < 0:
+            return None
+        chunk = self._chunks[c]
+        i = bisect_left(chunk, symbol)
+        if i < len(chunk) and chunk[i] == symbol:
+            return self._offsets[c] + i
+        return None
+
+    def patched(self, added=(), removed=()):
+        """A new sequence with `added` inserted and `removed` dropped, sharing the untouched chunks."""
+        if not self._chunks:
+            return SortedSymbols.from_sorted(sorted(set(added) - set(removed)))
+        changes = {}
+        for symbol in added:
+            changes.setdefault(max(bisect_right(self._firsts, symbol) - 1, 0), []).append((symbol, True))
+        for symbol in removed:
+            changes.setdefault(max(bisect_right(self._firsts, symbol) - 1, 0), []).append((symbol, False))
+        chunks = list(self._chunks)
+        # Back to front, so splitting or dropping a chunk doesn't move the ones still to patch
+        for c in sorted(changes, reverse=True):
+            chunk = list(chunks[c])
+            for symbol, add in changes[c]:
+                i = bisect_left(chunk, symbol)
+                present = i < len(chunk) and chunk[i] == symbol
+                if add and not present:
+                    chunk.insert(i, symbol)
+                elif not add and present:
+                    del chunk[i]
+            if len(chunk) > 2 * CHUNK:
+                chunks[c:c + 1] = [tuple(chunk[i:i + CHUNK]) for i in range(0, len(chunk), CHUNK)]
+            else:
+                chunks[c:c + 1] = [tuple(chunk)] if chunk else []
+        return SortedSymbols(chunks)
+
+
+class ViewSnapshot:
+    """
+    One published version of the visible list. It is never modified after
+    publishing, so the keyboard listener and the Tk thread read it without
+    locks; the writer replaces the whole object instead.
+
+    An alphabetical list is a SortedSymbols, so the writer derives the next
+    snapshot from this one with patched() and position() needs no index
+    of its own. A list in another order (sorted by a row query) is a plain
+    tuple with a symbol -> index map, built in full like the query itself.
+    Either way complete() uses a sorted copy as the prefix index.
+    """
+
+    __slots__ = ("version", "symbols", "alphabetical", "_positions", "_sorted")
+
+    def __init__(self, version, symbols, alphabetical=True):
+        self.version = version
+        self.alphabetical = alphabetical
+        if alphabetical:
+            self.symbols = symbols if isinstance(symbols, SortedSymbols) else SortedSymbols.from_sorted(symbols)
+            self._positions = None
+            self._sorted = self.symbols
+        else:
+            self.symbols = tuple(symbols)
+            self._positions = {s: i for i, s in enumerate(self.symbols)}
+            self._sorted = SortedSymbols.from_sorted(sorted(self.symbols))
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return self.position(symbol) is not None
+
+    def position(self, symbol):
+        """Index of symbol in the list, or None."""
+        if self._positions is None:
+            return self.symbols.position(symbol)
+        return self._positions.get(symbol)
+
+    def patched(self, added=(), removed=()):
+        """The next version of an alphabetical snapshot, with `added` shown and `removed` hidden."""
+        return ViewSnapshot(self.version + 1, self.symbols.patched(added, removed))
+
+    def complete(self, prefix, limit=10):
+        """Up to `limit` symbols starting with prefix, in symbol order."""
+        prefix = (prefix or "").strip().upper()
+        matches = []
+        for i in range(self._sorted.lower_bound(prefix), len(self._sorted)):
+            symbol = self._sorted[i]
+            if len(matches) >= limit or not symbol.startswith(prefix):
+                break
+            matches.append(symbol)
+        return matches
+
+
+class StateActor:
+    """
+    Runs every change to shared watchlist state on one writer thread.
+
+    submit() queues a command and returns a concurrent.futures.Future. The
+    writer runs commands one at a time in submission order, so they never
+    race each other. Once it has drained the queue it calls `after_batch`
+    a single time if any command in the batch was submitted with
+    refresh=True; that is where the owner publishes the visible list,
+    patched with the symbols the batch touched (publish_changes) or rebuilt. A burst of bulk edits and fetch pages costs one refresh.
+    Futures resolve after that refresh, so a caller waiting on one sees
+    its change in the snapshot.
+    """
+
+    def __init__(self, after_batch=None, name="state-writer"):
+        self.after_batch = after_batch
+        self.name = name
+        self.snapshot = ViewSnapshot(0, ())
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, refresh=True):
+        future = Future()
+        self._queue.put((future, fn, args, refresh))
+        return future
+
+    def publish(self, symbols, alphabetical=True):
+        """Replace the snapshot readers see. Writer thread only."""
+        self.snapshot = ViewSnapshot(self.snapshot.version + 1, symbols, alphabetical)
+        return self.snapshot
+
+    def publish_changes(self, added=(), removed=()):
+        """Publish the current alphabetical snapshot with symbols added and removed. Writer thread only."""
+        self.snapshot = self.snapshot.patched(added, removed)
+        return self.snapshot
+
+    def on_writer_thread(self):
+        return threading.current_thread() is self._thread
+
+    def wait_idle(self, timeout=None):
+        """Block until everything submitted so far has run and been published."""
+        try:
+            self.submit(lambda: None, refresh=False).result(timeout)
+        except FutureTimeout:
+            # Not the builtin TimeoutError before Python 3.11
+            return False
+        return True
+
+    def stop(self):
+        self._queue.put(_STOP)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            started = time.perf_counter()
+            refresh = False
+            outcomes = []
+            for item in batch:
+                if item is _STOP:
+                    return
+                future, fn, args, wants_refresh = item
+                refresh = refresh or wants_refresh
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    outcomes.append((future, fn(*args), None))
+                except Exception as e:
+                    print(f"{self.name}: {getattr(fn, '__name__', 'command')} failed: {e}")
+                    outcomes.append((future, None, e))
+
+            if refresh and self.after_batch:
+                try:
+                    self.after_batch()
+                except Exception as e:
+                    print(f"{self.name}: refresh failed: {e}")
+            metrics.observe("state.batch", time.perf_counter() - started)
+            metrics.count("state.commands", len(outcomes))
+            for future, result, error in outcomes:
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
@@ -1,190 +1,74 @@
-import customtkinter as ctk
-from tkinter import messagebox
 import os
 import time
 import threading
 import platform
 import sys
-from pynput.keyboard import Controller, Key, Listener
-from finviz_scraper import main as run_scraper
-
-class TickerNode:
-    def __init__(self, symbol):
-        self.symbol = symbol
-        self.next = None
-        self.prev = None
-
-class TickerLinkedList:
+import metrics
+from watchlist import Watchlist, parse_screeners
+
+# The window and keyboard-hook modules, and the ones only the window uses, are imported by
+# load_gui_modules() when the interactive mode starts, so command-line runs don't pay for them
+ctk = messagebox = Controller = Key = Listener = VirtualTickerList = None
+FetchJobManager = KeystrokeEngine = MarketHours = RefreshScheduler = StateActor = None
+
+
+def load_gui_modules():
+    global ctk, messagebox, Controller, Key, Listener, VirtualTickerList
+    global FetchJobManager, KeystrokeEngine, MarketHours, RefreshScheduler, StateActor
+    if ctk is not None:
+        return
+    import customtkinter as ctk
+    from tkinter import messagebox
+    from pynput.keyboard import Controller, Key, Listener
+    from virtual_list import VirtualTickerList
+    from fetch_jobs import FetchJobManager
+    from keystroke_engine import KeystrokeEngine
+    from refresh_scheduler import MarketHours, RefreshScheduler
+    from state_actor import StateActor
+
+
+class TypingProgram(Watchlist):
     def __init__(self):
-        self.head = None
-
-    def add(self, symbol):
-        symbol = (symbol or "").strip().upper()
-        if not symbol:
-            return
-        new_node = TickerNode(symbol)
-        if not self.head:
-            self.head = new_node
-            self.head.next = self.head
-            self.head.prev = self.head
-        else:
-            tail = self.head.prev
-            tail.next = new_node
-            new_node.prev = tail
-            new_node.next = self.head
-            self.head.prev = new_node
-
-    def remove(self, symbol):
-        if not self.head:
-            return False
-        symbol = symbol.strip().upper()
-        current = self.head
-        while True:
-            if current.symbol == symbol:
-                if current == self.head and current.next == self.head:
-                    self.head = None
-                else:
-                    current.prev.next = current.next
-                    current.next.prev = current.prev
-                    if current == self.head:
-                        self.head = current.next
-                return True
-            current = current.next
-            if current == self.head:
-                break
-        return False
-
-    def __iter__(self):
-        current = self.head
-        if not current:
-            return
-        while True:
-            yield current.symbol
-            current = current.next
-            if current == self.head:
-                break
-
-    def find(self, symbol):
-        if not self.head:
-            return None
-        current = self.head
-        while True:
-            if current.symbol == symbol:
-                return current
-            current = current.next
-            if current == self.head:
-                break
-        return None
-
-class TypingProgram:
-    def __init__(self):
-        self.symbol_widgets = {}
-        self.stock_url = "https://finviz.com/screener.ashx?v=111&f=cap_largeover,ta_alltime_b40h"
-        self.etf_url   = "https://finviz.com/screener.ashx?v=111&f=ind_exchangetradedfund,sh_avgvol_o1000,ta_alltime_b40h"
-
-        self.base_path = os.path.dirname(os.path.abspath(sys.argv[0]))
-        self.original_file = os.path.join(self.base_path, "original.txt")
-        self.fetched_file  = os.path.join(self.base_path, "fetched.txt")
-        self.blacklist_file = os.path.join(self.base_path, "blacklist.txt")
-        self.visible_symbols = []
-        self.original_ticker_symbols = TickerLinkedList()
-        self.ticker_symbols = TickerLinkedList()
-        self.fetched_tickers = []
-
-        if os.path.exists(self.original_file):
-            with open(self.original_file, "r") as cf:
-                local_count = sum(1 for _ in cf)
-            print(f"Loaded {local_count} tickers from original.txt")
-        else:
-            print("original.txt not found — starting with an empty ticker list.")
-            open(self.original_file, "a").close()
-
-        if os.path.exists(self.fetched_file):
-            with open(self.fetched_file, "r") as ff:
-                self.fetched_tickers = [line.strip().upper() for line in ff if line.strip()]
-            print(f"Loaded {len(self.fetched_tickers)} cached fetched tickers from fetched.txt")
-
-        self._load_original_from_file()
+        load_gui_modules()
+        super().__init__(os.path.dirname(os.path.abspath(sys.argv[0])))
+        # None, ("new", None) or ("dropped", since_timestamp); see on_history_filter
+        self.history_filter = None
+        # Filter/sort over the screener row data, e.g. "volume > 5M, sort by change desc"
+        self.row_query = ""
+        self.row_query_sorted = False
+        self._init_state()
 
         self.controller = Controller()
-        self.current_node = None
-        self.last_direction = None
 
         if platform.system() == "Darwin":
             self.shortcut_key = Key.cmd
         else:
             self.shortcut_key = Key.ctrl_l
 
-        self.create_gui()
-
-    def _atomic_write(self, path, lines):
-        tmp = path + ".tmp"
-        try:
-            with open(tmp, "w") as f:
-                for line in lines:
-                    f.write(line.rstrip("\n") + "\n")
-            os.replace(tmp, path)
-        except Exception:
-            try:
-                if os.path.exists(tmp):
-                    os.remove(tmp)
-            except Exception:
-                pass
-            raise
-
-    def _load_fetched_from_file(self):
-        if os.path.exists(self.fetched_file):
-            with open(self.fetched_file, "r") as ff:
-                self.fetched_tickers = [line.strip().upper() for line in ff if line.strip()]
-        else:
-            self.fetched_tickers = []
-
-    def _load_original_from_file(self):
-        self.original_ticker_symbols = TickerLinkedList()
-        if not os.path.exists(self.original_file):
-            open(self.original_file, "w").close()
-        with open(self.original_file, "r") as file:
-            for line in file:
-                s = line.strip().upper()
-                if s:
-                    self.original_ticker_symbols.add(s)
-
-    def add_to_blacklist(self, tickers):
-        if not isinstance(tickers, (list, set)):
-            tickers = [tickers]
+        # Global jump hotkey: press it, type the start of a symbol and Enter (see _handle_jump_key)
+        self.jump_key = Key.f2
+        self._jump_buffer = None
 
-        blacklist = self.load_blacklist()
-        blacklist.update([t.upper() for t in tickers])
-        sorted_blacklist = sorted(blacklist)
-
-        try:
-            self._atomic_write(self.blacklist_file, sorted_blacklist)
-        except Exception as e:
-            print(f"Failed to write blacklist: {e}")
-            with open(self.blacklist_file, "w") as bf:
-                for symbol in sorted_blacklist:
-                    bf.write(symbol + "\n")
+        # Milliseconds between injected characters (STOCKS_TYPE_DELAY_MS, STOCKS_SEARCH_DELAY_MS);
+        # raise them if the target app drops keys. Change self.keystrokes.char_delay at runtime.
+        self.keystrokes = KeystrokeEngine(self.controller, Key.enter, self.shortcut_key,
+                                          char_delay=float(os.environ.get("STOCKS_TYPE_DELAY_MS", "0")) / 1000,
+                                          search_char_delay=float(os.environ.get("STOCKS_SEARCH_DELAY_MS", "10")) / 1000)
 
-    def load_blacklist(self):
-        if not os.path.exists(self.blacklist_file):
-            open(self.blacklist_file, "a").close()
-        with open(self.blacklist_file, "r") as bf:
-            return {line.strip().upper() for line in bf if line.strip()}
+        # One scrape at a time: repeated requests join the running fetch, a changed screener set cancels it
+        self.fetch_jobs = FetchJobManager(self._fetch_and_save)
 
-    def save_ticker_symbols(self):
-        symbols = sorted(set(self.original_ticker_symbols))
+        # Background refresh of the screener results during market hours; STOCKS_REFRESH_MINUTES=0 turns it off.
+        # It always goes to the network, since the cache TTL is longer than the refresh interval.
+        self.refresh_minutes = float(os.environ.get("STOCKS_REFRESH_MINUTES", "15"))
+        self.refresher = RefreshScheduler(lambda: self.fetch_jobs.request(self._fetch_key(), force_refresh=True,
+                                                                          background=True).wait(),
+                                          interval=self.refresh_minutes * 60, hours=MarketHours(),
+                                          last_run=self.last_fetch_time())
 
-        try:
-            self._atomic_write(self.original_file, symbols)
-        except Exception as e:
-            print(f"Failed atomic write original.txt: {e}")
-            with open(self.original_file, "w") as file:
-                for symbol in symbols:
-                    file.write(symbol + "\n")
-
-        self.original_ticker_symbols = TickerLinkedList()
-        for s in symbols:
-            self.original_ticker_symbols.add(s)
+        self.create_gui()
+        if self.refresh_minutes > 0:
+            self.refresher.start()
 
     def schedule_update(self, full_refresh=True, delay=50):
         if hasattr(self, "_update_job") and self._update_job:
@@ -192,24 +76,27 @@ class TypingProgram:
 
         self._update_job = self.root.after(delay, lambda: self.update_ticker_list(full_refresh))
 
-    def _rebuild_ui_linked_list(self, visible_symbols):
-        prev_symbol = None
-        if self.current_node:
-            try:
-                prev_symbol = self.current_node.symbol
-            except Exception:
-                prev_symbol = None
-
-        self.ticker_symbols = TickerLinkedList()
-        for s in visible_symbols:
-            self.ticker_symbols.add(s)
-
-        if prev_symbol:
-            node = self.ticker_symbols.find(prev_symbol)
-            if node:
-                self.current_node = node
-                return
-        self.current_node = self.ticker_symbols.head if self.ticker_symbols.head else None
+    def _init_state(self):
+        # Every change to the watchlist, fetched and visible lists runs on this one writer thread.
+        # The keyboard listener and Tk only read the immutable ViewSnapshot it publishes.
+        self.state = StateActor(after_batch=self._recompute_visible)
+        self._include_fetched = False
+        # Symbols whose visibility commands may have changed since the last publish
+        self._touched = set()
+        # fetched_tickers as a set, for the per-symbol visibility checks; rebuilt when the list is replaced
+        self._fetched_lookup = (None, set())
+        # (snapshot, index of the current symbol, last direction); always replaced, never mutated
+        self.nav = (self.state.snapshot, 0, None)
+
+    def _when_done(self, future, on_success, action):
+        # Future callbacks run on the writer thread, so results are handed back to Tk
+        def done(f):
+            error = f.exception()
+            if error:
+                self.root.after(0, lambda: messagebox.showerror("Error", f"{action} failed: {error}"))
+            else:
+                self.root.after(0, on_success)
+        future.add_done_callback(done)
 
     def add_ticker_symbol(self):
         dialog = ctk.CTkToplevel(self.root)
@@ -227,68 +114,65 @@ class TypingProgram:
             if not new_ticker:
                 dialog.destroy()
                 return
+            checked = self._confirm_listed([new_ticker])
+            if checked is None:
+                return
+            if not checked:
+                dialog.destroy()
+                return
+            new_ticker = checked[0]
 
-            def do_add():
-                self.original_ticker_symbols.add(new_ticker)
-                self.save_ticker_symbols()
-                self.root.after(0, lambda: (self.schedule_update(full_refresh=True),
-                                           finalize_add(new_ticker)))
-
-            def finalize_add(ticker):
-                messagebox.showinfo("Success", f"Added '{ticker}' to the list.")
+            def finalize_add():
+                messagebox.showinfo("Success", f"Added '{new_ticker}' to the list.")
                 dialog.destroy()
 
-            threading.Thread(target=do_add, daemon=True).start()
+            self._when_done(self.state.submit(self.add_symbols, [new_ticker]), finalize_add, "Adding the symbol")
 
         submit_button = ctk.CTkButton(dialog, text="Submit", command=on_submit)
         submit_button.pack(pady=10)
         dialog.grab_set()
 
+    def _confirm_listed(self, symbols):
+        """
+        Check symbols against the symbol master and ask what to do with the
+        unlisted ones. Returns the symbols to add, or None to go back to the dialog.
+        """
+        _, unlisted = self.check_symbols(symbols)
+        if not unlisted:
+            return symbols
+        fixes = {s: fix for s, fix in unlisted.items() if fix}
+        unknown = [s for s, fix in unlisted.items() if not fix]
+        lines = []
+        if fixes:
+            lines.append("Listed as: " + ", ".join(f"{s} -> {fix}" for s, fix in fixes.items()))
+        if unknown:
+            lines.append("Not in the symbol master: " + ", ".join(unknown))
+        answer = messagebox.askyesnocancel(
+            "Check symbols", "\n".join(lines) + "\n\nYes: use the listed spellings and skip the unknown symbols"
+                                                "\nNo: add everything as typed\nCancel: edit the list")
+        if answer is None:
+            return None
+        if not answer:
+            return symbols
+        return [fixes.get(s, s) for s in symbols if s not in unlisted or s in fixes]
+
     def remove_ticker_symbol(self, ticker_to_remove=None):
         if not ticker_to_remove:
             return
 
         ticker_upper = ticker_to_remove.upper()
-        frame = self.symbol_widgets.pop(ticker_upper, None)
-        if frame:
-            try:
-                frame.destroy()
-            except Exception:
-                pass
-
-        def do_removal():
-            try:
-                self.add_to_blacklist(ticker_upper)
-            except Exception as e:
-                print(f"Error blacklisting {ticker_upper}: {e}")
-            finally:
-                self.root.after(0, lambda: self.schedule_update(full_refresh=True))
-
-        threading.Thread(target=do_removal, daemon=True).start()
+        # Hide the row right away; the refresh after blacklisting makes it final
+        self.ticker_view.set_symbols([s for s in self.state.snapshot.symbols if s != ticker_upper])
+        self.state.submit(self.add_to_blacklist, ticker_upper)
 
         self.root.after(0, lambda: (messagebox.showinfo("Success", f"Removed '{ticker_upper}' from the view (blacklisted)."),
                                    self.root.focus_force()))
 
     def remove_all_ticker_symbols(self):
         if messagebox.askyesno("Confirm", "Are you sure you want to remove all ticker symbols from view?"):
-            all_symbols = [s for s in self.original_ticker_symbols]
-            if all_symbols:
-                for frame in list(self.symbol_widgets.values()):
-                    try:
-                        frame.destroy()
-                    except Exception:
-                        pass
-                self.symbol_widgets.clear()
-
-                def do_all_remove():
-                    try:
-                        self.add_to_blacklist(all_symbols)
-                    except Exception as e:
-                        print(f"Failed to add all to blacklist: {e}")
-                    finally:
-                        self.root.after(0, lambda: self.schedule_update(full_refresh=True))
-
-                threading.Thread(target=do_all_remove, daemon=True).start()
+            self.ticker_view.set_symbols([])
+            # The watchlist is read on the writer thread, after any edits still queued
+            self.state.submit(lambda: self.add_to_blacklist(list(self.original_ticker_symbols)))
 
             messagebox.showinfo("Success", "All ticker symbols have been removed from view (blacklisted).")
             self.root.focus_force()
@@ -310,20 +194,16 @@ class TypingProgram:
                 dialog.destroy()
                 return
 
-            symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
-
-            def do_bulk_add():
-                for symbol in symbol_list:
-                    self.original_ticker_symbols.add(symbol)
-                self.save_ticker_symbols()
-                self.root.after(0, lambda: (self.schedule_update(full_refresh=True),
-                                           finalize_bulk_add(symbol_list)))
+            symbol_list = self._confirm_listed([s.strip() for s in symbols.split(",") if s.strip()])
+            if symbol_list is None:
+                return
 
-            def finalize_bulk_add(symbols_added):
+            def finalize_bulk_add():
                 messagebox.showinfo("Success", "Added all valid symbols to the list.")
                 dialog.destroy()
 
-            threading.Thread(target=do_bulk_add, daemon=True).start()
+            self._when_done(self.state.submit(self.add_symbols, symbol_list), finalize_bulk_add,
+                            "Adding the symbols")
 
         submit_button = ctk.CTkButton(dialog, text="Submit", command=on_submit)
         submit_button.pack(pady=10)
@@ -331,23 +211,35 @@ class TypingProgram:
         dialog.grab_set()
 
     def reload_tickers_from_urls(self):
-        threading.Thread(target=self._fetch_and_save, daemon=True).start()
+        self.start_fetch()
+
+    def _fetch_key(self):
+        return tuple(self.screeners.items())
+
+    def start_fetch(self):
+        job = self.fetch_jobs.request(self._fetch_key(), force_refresh=self.force_refresh_var.get())
+        if job.requests > 1:
+            done, total = job.progress
+            self.fetch_status.configure(text=f"Already fetching ({done} of {total} pages), the list updates when it finishes")
 
     def create_gui(self):
         self.root = ctk.CTk()
         self.root.title("Ticker Symbol Manager")
         self.root.geometry("900x800")
+        self.root.protocol("WM_DELETE_WINDOW", self.terminate_program)
 
         from tkinter import BooleanVar
         self.show_fetched_var = BooleanVar(master=self.root, value=False)
+        self.force_refresh_var = BooleanVar(master=self.root, value=False)
+        self.auto_refresh_var = BooleanVar(master=self.root, value=self.refresh_minutes > 0)
 
         ctk.set_appearance_mode("light")
 
         title_label = ctk.CTkLabel(self.root, text="Stock Ticker Manager", font=("Arial", 28, "bold"))
         title_label.pack(pady=20)
 
-        self.scrollable_frame = ctk.CTkScrollableFrame(self.root, height=600, width=850)
-        self.scrollable_frame.pack(pady=10)
+        self.ticker_view = VirtualTickerList(self.root, on_remove=self.remove_ticker_symbol, height=600, width=850)
+        self.ticker_view.pack(pady=10)
 
         button_frame = ctk.CTkFrame(self.root)
         button_frame.pack(pady=10, fill="x")
@@ -363,7 +255,7 @@ class TypingProgram:
 
         config_button = ctk.CTkButton(
             button_frame,
-            text="Configure URLs",
+            text="Configure Screeners",
             command=self.configure_urls,
             width=200
         )
@@ -380,214 +272,679 @@ class TypingProgram:
                                     variable=self.show_fetched_var)
         fetch_switch.pack(side="left", padx=(0,8))
 
-        self.update_ticker_list()
-
-    def update_ticker_list(self, full_refresh=True):
-        blacklist = self.load_blacklist()
-
-        if self.show_fetched_var.get():
-            if not self.fetched_tickers and os.path.exists(self.fetched_file):
-                self._load_fetched_from_file()
-            local_list = [s.upper() for s in self.original_ticker_symbols]
-            merged = sorted(set(local_list + self.fetched_tickers))
-            new_visible = [s for s in merged if s not in blacklist]
+        force_refresh_switch = ctk.CTkSwitch(controls_frame,
+                                             text="Force refresh (skip cache)",
+                                             variable=self.force_refresh_var)
+        force_refresh_switch.pack(side="left", padx=(0,8))
+
+        auto_refresh_switch = ctk.CTkSwitch(controls_frame,
+                                            text="Auto-refresh in market hours",
+                                            command=lambda: setattr(self.refresher, "paused",
+                                                                    not self.auto_refresh_var.get()),
+                                            variable=self.auto_refresh_var)
+        auto_refresh_switch.pack(side="left", padx=(0,8))
+        if self.refresh_minutes <= 0:
+            auto_refresh_switch.configure(state="disabled")
+
+        self.history_menu = ctk.CTkOptionMenu(controls_frame,
+                                              values=["All tickers", "New since last fetch", "Dropped since date..."],
+                                              command=self.on_history_filter,
+                                              width=200)
+        self.history_menu.pack(side="left", padx=(0,8))
+
+        self.fetch_status = ctk.CTkLabel(controls_frame, text="", anchor="w")
+        self.fetch_status.pack(side="left")
+
+        query_frame = ctk.CTkFrame(button_frame, fg_color="transparent")
+        query_frame.grid(row=2, column=0, columnspan=4, padx=10, pady=(10,0), sticky="w")
+
+        self.query_entry = ctk.CTkEntry(query_frame, width=520,
+                                        placeholder_text="Filter / sort, e.g. volume > 5M, sort by change desc")
+        self.query_entry.pack(side="left", padx=(0,8))
+        self.query_entry.bind("<Return>", lambda event: self.apply_row_query())
+
+        query_button = ctk.CTkButton(query_frame, text="Apply", command=self.apply_row_query, width=100)
+        query_button.pack(side="left", padx=(0,8))
+
+        self.jump_entry = ctk.CTkEntry(query_frame, width=140, placeholder_text="Jump to (F2)")
+        self.jump_entry.pack(side="left", padx=(8,8))
+        self.jump_entry.bind("<KeyRelease>", self._on_jump_typed)
+        self.jump_entry.bind("<Return>", self._on_jump_submit)
+
+        self.jump_hint = ctk.CTkLabel(query_frame, text="", anchor="w")
+        self.jump_hint.pack(side="left")
+
+        self.stats_button = ctk.CTkButton(query_frame, text="Show stats", width=100, command=self.toggle_stats)
+        self.stats_button.pack(side="left", padx=(8,0))
+
+        # Collapsible panel with the timings and counters from metrics.METRICS
+        self.stats_frame = ctk.CTkFrame(self.root)
+        self.stats_text = ctk.CTkTextbox(self.stats_frame, height=220, width=850, font=("Courier", 12), wrap="none")
+        self.stats_text.pack(padx=10, pady=(10,5))
+        stats_buttons = ctk.CTkFrame(self.stats_frame, fg_color="transparent")
+        stats_buttons.pack(fill="x", padx=10, pady=(0,10))
+        ctk.CTkButton(stats_buttons, text="Export JSON", width=120, command=self.export_metrics).pack(side="left")
+        ctk.CTkButton(stats_buttons, text="Reset", width=80, command=metrics.METRICS.reset).pack(side="left", padx=8)
+        self._stats_job = None
+
+        if self.warm_state:
+            self.show_fetched_var.set(self.warm_state.include_fetched)
+            self.state.submit(self._warm_start, self.warm_state, refresh=False)
         else:
-            new_visible = [s for s in self.original_ticker_symbols if s not in blacklist]
-            new_visible = sorted(set(new_visible))
-
-        old_visible = getattr(self, "visible_symbols", [])
-
-        if new_visible == old_visible and not full_refresh:
-            return
-
-        old_set = set(old_visible)
-        new_set = set(new_visible)
-
-        removed = old_set - new_set
-        for symbol in removed:
-            frame = self.symbol_widgets.pop(symbol, None)
-            if frame:
-                try:
-                    frame.destroy()
-                except Exception:
-                    pass
+            self.update_ticker_list()
+
+    def _warm_start(self, warm):
+        # Writer thread: publish the list saved on exit as is and put navigation back where it was
+        self._include_fetched = warm.include_fetched
+        snapshot = self.state.publish(warm.visible)
+        index = snapshot.position(warm.current)
+        if index is None:
+            index = min(warm.index, max(len(snapshot) - 1, 0))
+        self.nav = (snapshot, index, warm.last)
+        self.root.after(0, self._show_snapshot)
+
+    def apply_row_query(self):
+        text = self.query_entry.get().strip()
+        sort = None
+        if text:
+            try:
+                _, sort = self.parse_row_query(text)
+            except (ValueError, RuntimeError) as e:
+                messagebox.showerror("Filter / sort", str(e))
+                return
+        self.row_query = text
+        self.row_query_sorted = sort is not None
+        self.schedule_update(full_refresh=True)
+        if text and not len(self.screener_data()):
+            # Fetches only read the screener columns while a query is set
+            self.start_fetch()
 
-        added = [s for s in new_visible if s not in old_set]
-        for symbol in added:
-            self._create_symbol_row(symbol)
+    def update_ticker_list(self, full_refresh=True):
+        # Tk variables are read here on the Tk thread; the writer only sees plain values
+        self._include_fetched = self.show_fetched_var.get()
+        return self.state.submit(self._recompute_visible, full_refresh, refresh=False)
+
+    def _recompute_visible(self, full_refresh=False):
+        # Writer thread only. After a batch of edits only the symbols they touched are looked at and
+        # the snapshot is patched; switching what is shown (full_refresh) and the history and row
+        # query filters recompute the whole list.
+        with metrics.timer("list.refresh"):
+            snapshot = self.state.snapshot
+            if full_refresh or self.history_filter or self.row_query or not snapshot.alphabetical:
+                self._touched = set()
+                if self.history_filter:
+                    new_visible = self._history_filtered_symbols()
+                else:
+                    new_visible = self.compute_visible_symbols(include_fetched=self._include_fetched)
+                if self.row_query:
+                    new_visible = self.query_symbols(new_visible, self.row_query)
+                alphabetical = not self.row_query_sorted
+                if alphabetical != snapshot.alphabetical or len(new_visible) != len(snapshot) or \
+                        any(a != b for a, b in zip(new_visible, snapshot.symbols)):
+                    self.state.publish(new_visible, alphabetical=alphabetical)
+                elif not full_refresh:
+                    return
+            else:
+                touched, self._touched = self._touched, set()
+                added = [s for s in touched if s not in snapshot and self._is_visible(s)]
+                removed = [s for s in touched if s in snapshot and not self._is_visible(s)]
+                if not added and not removed:
+                    return
+                self.state.publish_changes(added, removed)
+        self.root.after(0, self._show_snapshot)
+
+    def _show_snapshot(self):
+        # Only the pooled rows on screen are touched, however long the list is
+        with metrics.timer("list.redraw"):
+            snapshot = self.state.snapshot
+            self.ticker_view.set_symbols(snapshot.symbols)
 
-        for widget in self.scrollable_frame.winfo_children():
             try:
-                widget.pack_forget()
+                self.root.update_idletasks()
             except Exception:
                 pass
-
-        for symbol in new_visible:
-            frame = self.symbol_widgets.get(symbol)
-            if frame:
-                try:
-                    frame.pack(fill="x", pady=5)
-                except Exception:
-                    pass
-
-        self.visible_symbols = new_visible
-        self._rebuild_ui_linked_list(new_visible)
-
+        metrics.gauge("list.symbols", len(snapshot))
+        metrics.gauge("list.row_widgets", len(self.ticker_view.rows))
+
+    def toggle_stats(self):
+        if self._stats_job:
+            self.root.after_cancel(self._stats_job)
+            self._stats_job = None
+            self.stats_frame.pack_forget()
+            self.stats_button.configure(text="Show stats")
+        else:
+            self.stats_frame.pack(pady=(0,10), fill="x")
+            self.stats_button.configure(text="Hide stats")
+            self._refresh_stats()
+
+    def _refresh_stats(self):
+        # Redrawn every second while the panel is open
+        self.stats_text.configure(state="normal")
+        self.stats_text.delete("1.0", "end")
+        self.stats_text.insert("1.0", metrics.METRICS.format())
+        self.stats_text.configure(state="disabled")
+        self._stats_job = self.root.after(1000, self._refresh_stats)
+
+    def export_metrics(self):
+        path = os.path.join(self.base_path, time.strftime("metrics-%Y%m%d-%H%M%S.json"))
         try:
-            self.root.update_idletasks()
-        except Exception:
-            pass
+            metrics.METRICS.dump(path)
+        except Exception as e:
+            messagebox.showerror("Stats", f"Failed to write {path}: {e}")
+            return
+        messagebox.showinfo("Stats", f"Saved the stats to {path}")
+
+    def on_history_filter(self, choice):
+        if choice == "New since last fetch":
+            self.history_filter = ("new", None)
+        elif choice == "Dropped since date...":
+            text = ctk.CTkInputDialog(title="Dropped since",
+                                      text="Show tickers that left the screens since (YYYY-MM-DD):").get_input()
+            try:
+                since = time.mktime(time.strptime(text.strip(), "%Y-%m-%d"))
+            except (AttributeError, ValueError):
+                if text is not None:
+                    messagebox.showerror("Invalid date", "Enter the date as YYYY-MM-DD.")
+                self.history_menu.set("All tickers")
+                self.history_filter = None
+            else:
+                self.history_filter = ("dropped", since)
+        else:
+            self.history_filter = None
+        self.schedule_update(full_refresh=True)
+
+    def _history_filtered_symbols(self):
+        mode, since = self.history_filter
+        if mode == "new":
+            new = self.new_since_last_fetch()
+            return [s for s in self.compute_visible_symbols(include_fetched=True) if s in new]
+        # Dropped tickers are no longer in the fetched list, so they are listed on their own
+        blacklist = self.load_blacklist()
+        return sorted(s for s in self.dropped_since(since) if s not in blacklist)
 
     def configure_urls(self):
         dialog = ctk.CTkToplevel(self.root)
-        dialog.title("Configure Finviz URLs")
+        dialog.title("Configure Finviz Screeners")
 
-        dialog.geometry("600x300")
-        dialog.minsize(500, 250)
+        dialog.geometry("700x420")
+        dialog.minsize(500, 300)
 
         dialog.update_idletasks()
         x = (dialog.winfo_screenwidth()  - dialog.winfo_reqwidth())  // 2
         y = (dialog.winfo_screenheight() - dialog.winfo_reqheight()) // 2
         dialog.geometry(f"+{x}+{y}")
 
-        ctk.CTkLabel(dialog, text="Stock URL:", anchor="w").pack(fill="x", padx=20, pady=(20, 5))
-        stock_entry = ctk.CTkEntry(dialog, width=560)
-        stock_entry.insert(0, self.stock_url)
-        stock_entry.pack(padx=20)
-
-        ctk.CTkLabel(dialog, text="ETF URL:", anchor="w").pack(fill="x", padx=20, pady=(15, 5))
-        etf_entry = ctk.CTkEntry(dialog, width=560)
-        etf_entry.insert(0, self.etf_url)
-        etf_entry.pack(padx=20)
+        ctk.CTkLabel(dialog, text="One screener per line: a name, then its Finviz URL", anchor="w"
+                     ).pack(fill="x", padx=20, pady=(20, 5))
+        text_area = ctk.CTkTextbox(dialog, height=280, width=660, wrap="none")
+        text_area.insert("1.0", "\n".join(f"{name} {url}" for name, url in self.screeners.items()))
+        text_area.pack(padx=20)
 
         def on_submit():
-            self.stock_url = stock_entry.get().strip()
-            self.etf_url   = etf_entry.get().strip()
+            try:
+                screeners = parse_screeners(text_area.get("1.0", "end").splitlines())
+            except ValueError as e:
+                messagebox.showerror("Screeners", str(e), parent=dialog)
+                return
+            if not screeners:
+                messagebox.showerror("Screeners", "Add at least one screener.", parent=dialog)
+                return
+            try:
+                self.save_screeners(screeners)
+            except Exception as e:
+                messagebox.showerror("Screeners", f"Failed to save screeners.txt: {e}", parent=dialog)
+                return
             dialog.destroy()
             if self.show_fetched_var.get():
-                threading.Thread(target=self._fetch_and_save, daemon=True).start()
+                self.start_fetch()
+            else:
+                # Nothing shows the old screens any more, so don't let a fetch of them finish
+                self.fetch_jobs.cancel(keep=self._fetch_key())
 
         save_btn = ctk.CTkButton(dialog, text="Save", command=on_submit)
         save_btn.pack(pady=20)
 
         dialog.grab_set()
 
-    def _create_symbol_row(self, symbol):
-        if symbol in self.symbol_widgets:
-            return
-
-        symbol_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="#f0f0f0", height=50)
-        symbol_frame.pack(fill="x", pady=5)
-        self.symbol_widgets[symbol] = symbol_frame
-
-        symbol_frame.bind("<Enter>", lambda e, frame=symbol_frame: frame.configure(fg_color="#d3d3d3"))
-        symbol_frame.bind("<Leave>", lambda e, frame=symbol_frame: frame.configure(fg_color="#f0f0f0"))
-
-        ticker_label = ctk.CTkLabel(symbol_frame, text=symbol, font=("Arial", 16), anchor="w")
-        ticker_label.place(relx=0.02, rely=0.5, anchor="w")
-
-        remove_button = ctk.CTkButton(symbol_frame, text="Remove", width=100,
-                                    command=lambda sym=symbol: self.remove_ticker_symbol(sym))
-        remove_button.place(relx=0.95, rely=0.5, anchor="e")
-
     def terminate_program(self):
         if hasattr(self, "listener"):
             self.listener.stop()
+        self.keystrokes.stop()
+        self.refresher.stop()
+        self.fetch_jobs.cancel()
+        self.state.wait_idle(5)
+        self.state.stop()
+        # Read before close(), which shuts the SQLite connection; saved after it, once the files are final
+        warm = None if self.db else self._warm_start_args()
+        self.close()
+        if warm:
+            self.save_warm_start(*warm)
         self.root.destroy()
 
+    def _warm_start_args(self):
+        snapshot, index, last = self._current_nav()
+        visible = list(snapshot.symbols)
+        if self.history_filter or self.row_query:
+            # Those filters start off on the next launch
+            visible = self.compute_visible_symbols(include_fetched=self._include_fetched)
+        current = snapshot.symbols[index] if len(snapshot) else None
+        return visible, self._include_fetched, current, index, last
+
     def on_fetch_toggle(self):
         if self.show_fetched_var.get():
-            if os.path.exists(self.fetched_file):
-                if not self.fetched_tickers:
-                    self._load_fetched_from_file()
+            # Saved results (fetched.txt is loaded by the refresh on the writer thread) or a new fetch
+            if (self.db and self.fetched_tickers) or (not self.db and os.path.exists(self.fetched_file)):
                 self.schedule_update(full_refresh=True)
             else:
-                threading.Thread(target=self._fetch_and_save, daemon=True).start()
+                self.start_fetch()
         else:
             self.schedule_update(full_refresh=True)
 
-    def _fetch_and_save(self):
-        try:
-            fetched = run_scraper(self.stock_url, self.etf_url)
-            fetched_set = sorted({s.strip().upper() for s in fetched if s and s.strip()})
+    def _show_fetch_status(self, job, text):
+        # Progress of a job that has been replaced would overwrite its successor's
+        if job is self.fetch_jobs.current:
+            self.root.after(0, lambda: self.fetch_status.configure(text=text))
 
-            try:
-                self._atomic_write(self.fetched_file, fetched_set)
-            except Exception as e:
-                print(f"Atomic write failed for fetched.txt: {e}")
-                with open(self.fetched_file, "w") as ff:
-                    for t in fetched_set:
-                        ff.write(t + "\n")
+    def _fetch_and_save(self, job):
+        # Runs on the fetch job's thread. A background job (scheduled refresh nobody else asked
+        # for in the meantime) doesn't pop up dialogs.
+        def on_progress(done, total):
+            job.progress = (done, total)
+            self._show_fetch_status(job, f"Fetching page {done} of {total}...")
 
-            self.fetched_tickers = fetched_set
+        # Pages are added to fetched_tickers in place, so keep a copy to go back to on cancel
+        saved = list(self.fetched_tickers)
+        try:
+            # Show each page as it lands; previously cached tickers stay until the fetch completes
+            fetched_set, report = self.fetch(
+                force_refresh=job.force_refresh, on_progress=on_progress, cancel=job.cancelled, screeners=dict(job.key),
+                on_batch=lambda page: self.state.submit(self._add_fetched, page),
+                # The compact tickers view has no columns; read the full rows only while a query uses them
+                rows=bool(self.row_query))
+
+            self._show_fetch_status(job, f"Fetched {len(fetched_set)} tickers" +
+                                    ("" if report.ok else f", {len(report.errors)} pages failed"))
+            if job.background:
+                notify = lambda: None
+            elif report.ok:
+                notify = lambda: messagebox.showinfo("Fetched", f"Fetched {len(fetched_set)} tickers and updated files.")
+            else:
+                notify = lambda: messagebox.showwarning(
+                    "Partial fetch", f"Fetched {len(fetched_set)} tickers, but some pages failed.\n{report.summary()}")
 
-            self.root.after(0, lambda: (self.schedule_update(full_refresh=True),
-                                       messagebox.showinfo("Fetched", f"Fetched {len(fetched_set)} tickers and updated files.")))
+            self._when_done(self.state.submit(self._set_fetched, fetched_set), notify, "Updating the list")
+            return fetched_set
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch tickers: {e}"))
+            if job.cancelled.is_set():
+                # Take back the pages shown so far; the job that replaced this one brings its own
+                print(f"Fetch of {', '.join(name for name, _ in job.key)} cancelled")
+                self.state.submit(self._set_fetched, saved)
+                raise
+            self._show_fetch_status(job, "Fetch failed")
+            if job.background:
+                print(f"Background refresh failed: {e}")
+            else:
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch tickers: {e}"))
+            raise
+
+    def _is_visible(self, symbol):
+        # What compute_visible_symbols decides, for one symbol
+        if symbol in self.blacklist:
+            return False
+        return symbol in self.original_ticker_symbols or (self._include_fetched and symbol in self._fetched_set())
+
+    def _fetched_set(self):
+        if self._fetched_lookup[0] is not self.fetched_tickers:
+            self._fetched_lookup = (self.fetched_tickers, set(self.fetched_tickers))
+        return self._fetched_lookup[1]
+
+    def _set_fetched(self, tickers):
+        # Writer thread only; the batch refresh shows the change if fetched tickers are visible
+        tickers = list(tickers)
+        new = set(tickers)
+        self._touched |= new.symmetric_difference(self._fetched_set())
+        self.fetched_tickers = tickers
+        self._fetched_lookup = (tickers, new)
+
+    def _add_fetched(self, tickers):
+        # Writer thread only: one fetched page, added in place
+        fetched = self._fetched_set()
+        new = [s for s in tickers if s not in fetched]
+        self.fetched_tickers.extend(new)
+        fetched.update(new)
+        self._touched.update(new)
+
+    def add_symbols(self, symbols):
+        super().add_symbols(symbols)
+        self._touched.update(s.strip().upper() for s in symbols)
+
+    def add_to_blacklist(self, tickers):
+        added = super().add_to_blacklist(tickers)
+        self._touched.update(added)
+        return added
+
+    def remove_symbols(self, symbols):
+        removed = super().remove_symbols(symbols)
+        self._touched.update(s.strip().upper() for s in removed)
+        return removed
+
+    def _current_nav(self):
+        """self.nav moved onto the latest snapshot, keeping the current symbol (or the next one still visible)."""
+        snapshot = self.state.snapshot
+        nav = self.nav
+        if nav[0] is snapshot:
+            return nav
+        old, index, last = nav
+        new_index = 0
+        for step in range(min(len(old), 1000)):
+            position = snapshot.position(old.symbols[(index + step) % len(old)])
+            if position is not None:
+                new_index = position
+                break
+        nav = (snapshot, new_index, last)
+        self.nav = nav
+        return nav
+
+    def jump_to(self, prefix, typed=False):
+        """
+        Move navigation to the first visible symbol starting with prefix and
+        return it, or None if nothing matches. typed=True means the target app
+        already got the prefix and Enter: if that was the whole symbol, the next
+        Down continues after it, otherwise the next Down types the match.
+        """
+        snapshot = self.state.snapshot
+        matches = snapshot.complete(prefix, 1)
+        if not matches:
+            return None
+        index = snapshot.position(matches[0])
+        if typed and matches[0] == prefix.strip().upper():
+            self.nav = (snapshot, (index + 1) % len(snapshot), "down")
+        else:
+            self.nav = (snapshot, index, None)
+        self.root.after(0, lambda: self.ticker_view.see(matches[0]))
+        return matches[0]
+
+    def _on_jump_typed(self, event=None):
+        prefix = self.jump_entry.get().strip()
+        matches = self.state.snapshot.complete(prefix, 8) if prefix else []
+        self.jump_hint.configure(text="  ".join(matches))
+        if matches:
+            self.ticker_view.see(matches[0])
+
+    def _on_jump_submit(self, event=None):
+        symbol = self.jump_to(self.jump_entry.get().strip())
+        if symbol:
+            self.jump_entry.delete(0, "end")
+            self.jump_hint.configure(text=f"Next: {symbol}")
+        else:
+            self.jump_hint.configure(text="No match")
+
+    def _handle_jump_key(self, key):
+        # After the jump hotkey, letters build a prefix, Backspace edits it, Enter jumps and
+        # anything else cancels. Keys are not swallowed: the target app sees the same typing,
+        # so in TradingView the symbol loads there as well. Returns True if the key was used.
+        char = getattr(key, "char", None)
+        if char and (char.isalnum() or char in ".-"):
+            self._jump_buffer += char.upper()
+        elif key == Key.backspace:
+            self._jump_buffer = self._jump_buffer[:-1]
+        elif key == Key.enter:
+            prefix, self._jump_buffer = self._jump_buffer, None
+            symbol = self.jump_to(prefix, typed=True) if prefix else None
+            self.root.after(0, lambda: self.jump_hint.configure(
+                text=f"Jumped to {symbol}" if symbol else f"No match for {prefix}"))
+            return True
+        else:
+            self._jump_buffer = None
+            return key == Key.esc
+        buffer = self._jump_buffer
+        self.root.after(0, lambda: self.jump_hint.configure(text=f"Jump: {buffer}"))
+        return True
 
     def on_press(self, key):
+        # Runs on the pynput listener thread: reads the published snapshot, moves self.nav and queues the typing
+        started = time.perf_counter()
         try:
-            if key == Key.down:
-                if self.current_node:
-                    if self.last_direction == "up":
-                        if self.current_node.next and self.current_node.next.next:
-                            self.current_node = self.current_node.next.next
-                    self.type_word(self.current_node.symbol)
-                    self.current_node = self.current_node.next if self.current_node.next else self.current_node
-                    self.last_direction = "down"
-
-            elif key == Key.up:
-                if self.current_node:
-                    if self.last_direction == "down":
-                        if self.current_node.prev and self.current_node.prev.prev:
-                            self.current_node = self.current_node.prev.prev
-                    self.type_word(self.current_node.symbol)
-                    self.current_node = self.current_node.prev if self.current_node.prev else self.current_node
-                    self.last_direction = "up"
-
-            elif key == Key.left:
-                self.controller.press(self.shortcut_key)
-                self.controller.press('w')
-                self.controller.release('w')
-                self.controller.release(self.shortcut_key)
+            if self._jump_buffer is not None and self._handle_jump_key(key):
+                return
+            if key == self.jump_key:
+                self._jump_buffer = ""
+                self.root.after(0, lambda: self.jump_hint.configure(text="Jump: type a symbol, Enter"))
+                return
 
-            elif key == Key.right:
-                if self.last_direction in ["up", "down"] and self.current_node:
-                    self.controller.press(self.shortcut_key)
-                    self.controller.press('t')
-                    self.controller.release('t')
-                    self.controller.release(self.shortcut_key)
+            if key in (Key.down, Key.up, Key.right):
+                snapshot, index, last = self._current_nav()
+                count = len(snapshot)
+                if not count:
+                    return
 
-                    if self.last_direction == "up":
-                        next_node = self.current_node.next if self.current_node.next else self.current_node
-                    else:
-                        next_node = self.current_node.prev if self.current_node.prev else self.current_node
+                if key == Key.down:
+                    if last == "up":
+                        index = (index + 2) % count
+                    self.type_word(snapshot.symbols[index])
+                    self.nav = (snapshot, (index + 1) % count, "down")
 
-                    next_symbol = next_node.symbol
-                    word_to_type = next_symbol + ' stock'
+                elif key == Key.up:
+                    if last == "down":
+                        index = (index - 2) % count
+                    self.type_word(snapshot.symbols[index])
+                    self.nav = (snapshot, (index - 1) % count, "up")
 
-                    for char in word_to_type:
-                        self.controller.type(char)
-                        time.sleep(0.01)
+                elif last in ("up", "down"):
+                    target = (index + 1) % count if last == "up" else (index - 1) % count
+                    self.keystrokes.search(snapshot.symbols[target] + ' stock')
 
-                    self.controller.press(Key.enter)
-                    self.controller.release(Key.enter)
+            elif key == Key.left:
+                self.keystrokes.close_tab()
 
         except AttributeError:
             pass
+        finally:
+            metrics.observe("keys.on_press", time.perf_counter() - started)
 
     def type_word(self, word):
-        for char in word:
-            self.controller.type(char)
-        self.controller.press(Key.enter)
-        self.controller.release(Key.enter)
+        self.keystrokes.type_symbol(word)
 
     def start(self):
         self.listener = Listener(on_press=self.on_press)
         threading.Thread(target=self.listener.start, daemon=True).start()
         self.root.mainloop()
 
+def _symbols(args):
+    # Accept "AAPL MSFT" as well as the comma-separated form the bulk-add dialog takes
+    return [s.strip().upper() for arg in args for s in arg.split(",") if s.strip()]
+
+
+def _refresh_forever(watchlist, args):
+    from refresh_scheduler import MarketHours, RefreshScheduler
+    refresher = RefreshScheduler(lambda: watchlist.fetch(force_refresh=True, rows=args.rows), interval=args.every * 60,
+                                 hours=None if args.all_hours else MarketHours(),
+                                 last_run=watchlist.last_fetch_time())
+    refresher.start()
+    print(f"Refreshing every {args.every:g} minutes" + ("" if args.all_hours else " during market hours")
+          + ", Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        refresher.stop()
+    return 0
+
+
+def run_command(argv):
+    """Headless mode: python stocks.py fetch | list | add | remove | blacklist ..."""
+    import argparse
+    import contextlib
+
+    parser = argparse.ArgumentParser(prog="stocks.py",
+                                     description="Manage the watchlist without opening the window.")
+    parser.add_argument("--metrics", metavar="FILE", help="write timings and counters to FILE as JSON when done")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fetch = commands.add_parser("fetch", help="scrape the screeners in screeners.txt (or --screener) "
+                                              "into fetched.txt / stocks.db")
+    fetch.add_argument("--force-refresh", action="store_true", help="skip the response cache")
+    fetch.add_argument("--screener", action="append", metavar="NAME=URL",
+                       help="fetch this screener instead of the ones in screeners.txt (repeatable)")
+    fetch.add_argument("--parse-processes", type=int, metavar="N",
+                       help="parse pages in N worker processes (default: STOCKS_PARSE_PROCESSES or 0)")
+    fetch.add_argument("--every", type=float, metavar="MINUTES",
+                       help="keep running and refetch every MINUTES during market hours")
+    fetch.add_argument("--all-hours", action="store_true", help="with --every, also refetch outside market hours")
+    fetch.add_argument("--rows", action="store_true",
+                       help="also save the screener columns 'list --query' uses (reads 20 rows per request "
+                            "instead of 1000 symbols)")
+    show = commands.add_parser("list", help="print the visible watchlist, one symbol per line")
+    show.add_argument("--fetched", action="store_true",
+                      help="include fetched tickers, like the 'Show fetched tickers' switch")
+    show.add_argument("--query", help='filter/sort by screener data, e.g. "volume > 5M, sort by change desc"')
+    show.add_argument("--tags", action="store_true",
+                      help="after each symbol, list the screeners that returned it in the last fetch")
+    screeners = commands.add_parser("screeners", help="print the screeners in screeners.txt, or edit them")
+    screeners.add_argument("--add", nargs=2, metavar=("NAME", "URL"), help="add or replace a screener")
+    screeners.add_argument("--remove", metavar="NAME", help="remove a screener")
+    add = commands.add_parser("add", help="add symbols to the watchlist")
+    add.add_argument("symbols", nargs="+")
+    add.add_argument("--force", action="store_true", help="add symbols the symbol master doesn't list, as typed")
+    check = commands.add_parser("check", help="print watchlist symbols the symbol master doesn't list, "
+                                              "with the listed spelling where there is one")
+    check.add_argument("--fix", action="store_true", help="replace them with the listed spellings")
+    commands.add_parser("remove", help="delete symbols from original.txt").add_argument("symbols", nargs="+")
+    commands.add_parser("blacklist", help="hide symbols everywhere; with no symbols, print the blacklist"
+                        ).add_argument("symbols", nargs="*")
+    history = commands.add_parser("history", help="tickers that entered or left the screens")
+    history.add_argument("--since", metavar="YYYY-MM-DD",
+                         help="compare the latest fetch with the screens as of this date "
+                              "(default: with the fetch before it)")
+    history.add_argument("--dropped", action="store_true", help="print the tickers that left instead")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout
+    # Status messages go to stderr so stdout only carries the result
+    with contextlib.redirect_stdout(sys.stderr):
+        watchlist = Watchlist(os.path.dirname(os.path.abspath(sys.argv[0])))
+        try:
+            if args.command == "fetch":
+                if args.screener:
+                    try:
+                        watchlist.screeners = parse_screeners(s.replace("=", " ", 1) for s in args.screener)
+                    except ValueError as e:
+                        print(f"--screener: {e}")
+                        return 2
+                if args.parse_processes is not None:
+                    watchlist.parse_processes = args.parse_processes
+                if args.every:
+                    return _refresh_forever(watchlist, args)
+                try:
+                    fetched, report = watchlist.fetch(force_refresh=args.force_refresh, rows=args.rows)
+                except RuntimeError as e:
+                    print(f"Failed to fetch tickers: {e}")
+                    return 1
+                for name, stats in report.screeners.items():
+                    print(f"  {name}: {stats['tickers']} tickers in {stats['seconds']:.1f}s")
+                print(f"Fetched {len(fetched)} tickers")
+                return 0 if report.ok else 1
+
+            if args.command == "list":
+                symbols = watchlist.compute_visible_symbols(include_fetched=args.fetched)
+                if args.query:
+                    try:
+                        symbols = watchlist.query_symbols(symbols, args.query)
+                    except (ValueError, RuntimeError) as e:
+                        print(e)
+                        return 2
+                    if not len(watchlist.screener_data()):
+                        print("No screener columns saved yet, run 'stocks.py fetch --rows' first")
+                if args.tags:
+                    tags = watchlist.screener_tags()
+                    out.writelines("\t".join((s,) + tags.get(s, ())) + "\n" for s in symbols)
+                else:
+                    out.writelines(s + "\n" for s in symbols)
+            elif args.command == "screeners":
+                screeners = dict(watchlist.screeners)
+                if args.add:
+                    try:
+                        screeners.update(parse_screeners([" ".join(args.add)]))
+                    except ValueError as e:
+                        print(e)
+                        return 2
+                if args.remove:
+                    if screeners.pop(args.remove, None) is None:
+                        print(f"No screener called '{args.remove}'")
+                        return 1
+                if args.add or args.remove:
+                    if not screeners:
+                        print("Can't remove the last screener")
+                        return 1
+                    watchlist.save_screeners(screeners)
+                out.writelines(f"{name}\t{url}\n" for name, url in watchlist.screeners.items())
+            elif args.command == "add":
+                symbols = _symbols(args.symbols)
+                _, unlisted = watchlist.check_symbols(symbols)
+                skipped = []
+                if unlisted and not args.force:
+                    for symbol, fix in unlisted.items():
+                        if fix:
+                            print(f"{symbol} is listed as {fix}")
+                        else:
+                            skipped.append(symbol)
+                    symbols = [unlisted.get(s) or s for s in symbols if s not in skipped]
+                watchlist.add_symbols(symbols)
+                print(f"Added {len(symbols)} symbols")
+                if skipped:
+                    print(f"Not in the symbol master, add them with --force: {', '.join(skipped)}")
+                    return 1
+            elif args.command == "check":
+                if watchlist.symbol_master() is None:
+                    print(f"No symbol master at {watchlist.symbol_master_file}")
+                    return 2
+                _, unlisted = watchlist.check_symbols(list(watchlist.original_ticker_symbols))
+                out.writelines(f"{s}\t{fix or ''}\n" for s, fix in unlisted.items())
+                fixes = {s: fix for s, fix in unlisted.items() if fix}
+                if args.fix and fixes:
+                    watchlist.remove_symbols(list(fixes))
+                    watchlist.add_symbols(list(fixes.values()))
+                    print(f"Renamed {len(fixes)} symbols to their listed spelling")
+                print(f"{len(unlisted)} of {len(watchlist.original_ticker_symbols)} symbols are not in the symbol master")
+                return 1 if len(unlisted) > (len(fixes) if args.fix else 0) else 0
+            elif args.command == "remove":
+                symbols = _symbols(args.symbols)
+                removed = watchlist.remove_symbols(symbols)
+                print(f"Removed {len(removed)} symbols")
+                missing = sorted(set(symbols) - set(removed))
+                if missing:
+                    print(f"Not in the watchlist: {', '.join(missing)}")
+                    return 1
+            elif args.command == "history":
+                if args.since:
+                    try:
+                        since = time.mktime(time.strptime(args.since, "%Y-%m-%d"))
+                    except ValueError:
+                        print(f"--since: expected a date like 2024-05-31, got '{args.since}'")
+                        return 2
+                    entered, exited = watchlist.history.changes_since(since)
+                else:
+                    entered, exited = watchlist.history.last_fetch_changes()
+                print(f"{len(entered)} entered, {len(exited)} left over {len(watchlist.history)} recorded fetches")
+                out.writelines(s + "\n" for s in sorted(exited if args.dropped else entered))
+            elif args.command == "blacklist":
+                if args.symbols:
+                    added = watchlist.add_to_blacklist(_symbols(args.symbols))
+                    print(f"Blacklisted {len(added)} new symbols")
+                else:
+                    out.writelines(s + "\n" for s in sorted(watchlist.blacklist.snapshot()))
+            return 0
+        finally:
+            watchlist.close()
+            if args.metrics:
+                metrics.METRICS.dump(args.metrics)
+
+
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # Parse worker processes (STOCKS_PARSE_PROCESSES) re-run the .exe itself; let them start as workers
+        import multiprocessing
+        multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))
     typing_program = TypingProgram()
     typing_program.start()
\ No newline at end of file
@@ -0,0 +1,185 @@
+import mmap
+import os
+import re
+import struct
+
+MAGIC = b"SYMIDX1\n"
+_HEADER = struct.Struct("<qqII")  # source mtime_ns, source size, record count, record width
+_HEADER_NAMES = {"symbol", "ticker", "act symbol", "nasdaq symbol", "cqs symbol"}
+_SEPARATORS = re.compile(r"[.\-/ ]+")
+
+
+def read_listing(lines):
+    """
+    Symbols from a listing dump: one symbol per line, or delimited rows
+    ('|', ',' or tab, as in nasdaqlisted.txt / otherlisted.txt) with the
+    symbol in the first column. Header and "File Creation Time" lines are
+    skipped, and so is anything that isn't plain ASCII.
+    """
+    symbols = set()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or line.startswith("File Creation Time"):
+            continue
+        for delimiter in ("|", ",", "\t"):
+            if delimiter in line:
+                line = line.split(delimiter, 1)[0]
+                break
+        symbol = line.strip().strip('"').upper()
+        if not symbol or symbol.lower() in _HEADER_NAMES or not symbol.isascii():
+            continue
+        symbols.add(symbol)
+    return symbols
+
+
+def build_index(source, index_path):
+    """Write the sorted fixed-width index of `source` to index_path, stamped with its mtime and size."""
+    with open(source, "r", encoding="utf-8", errors="replace") as f:
+        records = sorted(s.encode("ascii") for s in read_listing(f))
+    width = max((len(r) for r in records), default=1)
+    st = os.stat(source)
+    tmp = index_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + _HEADER.pack(st.st_mtime_ns, st.st_size, len(records), width))
+        # NUL padding sorts before every character, so the padded records stay in order
+        f.write(b"".join(r.ljust(width, b"\0") for r in records))
+    os.replace(tmp, index_path)
+    return len(records)
+
+
+class SymbolMaster:
+    """
+    The listed symbols from a symbol-master file (an exchange listing dump),
+    looked up through a sorted, fixed-width index that is memory-mapped
+    rather than read: opening costs one mmap however long the listing is,
+    and a lookup is a binary search over the records. The index is rebuilt
+    from the source whenever the source's mtime or size changes.
+    """
+
+    def __init__(self, source, index_path):
+        self.source = source
+        self.index_path = index_path
+        self._file = None
+        self._map = None
+        self.count = 0
+        self.width = 1
+        self._open()
+
+    def stale(self):
+        """True if the index doesn't match the source file (any more)."""
+        st = os.stat(self.source)
+        try:
+            with open(self.index_path, "rb") as f:
+                header = f.read(len(MAGIC) + _HEADER.size)
+        except OSError:
+            return True
+        if not header.startswith(MAGIC) or len(header) < len(MAGIC) + _HEADER.size:
+            return True
+        mtime_ns, size, _, _ = _HEADER.unpack_from(header, len(MAGIC))
+        return (mtime_ns, size) != (st.st_mtime_ns, st.st_size)
+
+    def _open(self):
+        if self.stale():
+            count = build_index(self.source, self.index_path)
+            print(f"Indexed {count} symbols from {os.path.basename(self.source)}")
+        self._file = open(self.index_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, self.count, self.width = _HEADER.unpack_from(self._map, len(MAGIC))
+        # With NumPy, batches are looked up with one searchsorted over a view of the map (no copy)
+        try:
+            import numpy as np
+        except ImportError:
+            self._records = None
+        else:
+            self._records = np.frombuffer(self._map, dtype=f"S{self.width}", count=self.count,
+                                          offset=len(MAGIC) + _HEADER.size)
+
+    def __len__(self):
+        return self.count
+
+    def _key(self, symbol):
+        try:
+            key = (symbol or "").strip().upper().encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        if not key or len(key) > self.width:
+            return None
+        return key
+
+    def _record(self, i):
+        start = len(MAGIC) + _HEADER.size + i * self.width
+        return self._map[start:start + self.width]
+
+    def __contains__(self, symbol):
+        key = self._key(symbol)
+        if key is None:
+            return False
+        key = key.ljust(self.width, b"\0")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < self.count and self._record(lo) == key
+
+    def contains(self, symbols):
+        """A list of booleans: whether each of `symbols` is listed."""
+        if self._records is None or not self.count:
+            return [s in self for s in symbols]
+        import numpy as np
+        keys = [(s or "").strip().upper() for s in symbols]
+        try:
+            # One byte wider than the records, so longer symbols can't match a truncated prefix
+            queries = np.array(keys, dtype=f"S{self.width + 1}")
+        except UnicodeEncodeError:
+            return [s in self for s in symbols]
+        if not len(queries):
+            return []
+        pos = np.minimum(np.searchsorted(self._records, queries), self.count - 1)
+        return ((self._records[pos] == queries) & (queries != b"")).tolist()
+
+    def _variants(self, symbol):
+        typed = (symbol or "").strip().upper()
+        symbol = typed.lstrip("$")
+        parts = [p for p in _SEPARATORS.split(symbol) if p] if _SEPARATORS.search(symbol) else [symbol]
+        if len(parts) == 1 and len(symbol) > 2:
+            # No separator at all: try one before the class letter
+            parts = [symbol[:-1], symbol[-1]]
+        candidates = []
+        for separator in (".", "-", "/", " ", ""):
+            candidate = separator.join(parts)
+            if candidate and candidate != typed and candidate not in candidates:
+                candidates.append(candidate)
+        return candidates
+
+    def suggest(self, symbol):
+        """
+        A listed spelling of `symbol` with other share-class separators
+        (BRK-B / BRK/B / BRKB -> BRK.B) or without a leading $, or None.
+        """
+        return self.check([symbol])[1].get(symbol)
+
+    def check(self, symbols):
+        """Split symbols into (listed, {unlisted symbol: suggested spelling or None})."""
+        symbols = list(symbols)
+        listed, unlisted = [], {}
+        for symbol, found in zip(symbols, self.contains(symbols)):
+            if found:
+                listed.append(symbol)
+            else:
+                unlisted[symbol] = None
+        variants = [(symbol, v) for symbol in unlisted for v in self._variants(symbol)]
+        for (symbol, variant), found in zip(variants, self.contains([v for _, v in variants])):
+            if found and unlisted[symbol] is None:
+                unlisted[symbol] = variant
+        return listed, unlisted
+
+    def close(self):
+        if self._map:
+            # The NumPy view has to go before the map can be closed
+            self._records = None
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
@@ -0,0 +1,43 @@
+"""
+The snapshot patched from each batch's touched symbols has to match a full
+recompute after any mix of watchlist, blacklist and fetched edits.
+"""
+import os
+import random
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import stubs  # noqa: E402
+
+stubs.install()
+
+
+def test_patched_snapshot_matches_full_recompute():
+    rng = random.Random(7)
+    pool = [f"S{i:03d}" for i in range(300)]
+    with tempfile.TemporaryDirectory() as tmp:
+        app = stubs.headless_program(tmp, pool[:100], pool[100:200], pool[::17])
+        try:
+            app.show_fetched_var.set(True)
+            app.update_ticker_list().result()
+            for step in range(200):
+                op = rng.randrange(4)
+                picked = rng.sample(pool, rng.randint(1, 5))
+                if op == 0:
+                    app.state.submit(app.add_symbols, picked).result()
+                elif op == 1:
+                    app.state.submit(app.remove_symbols, picked).result()
+                elif op == 2:
+                    app.state.submit(app.add_to_blacklist, picked).result()
+                else:
+                    app.state.submit(app._add_fetched, picked).result()
+                patched = list(app.state.snapshot.symbols)
+                app.state.submit(app._recompute_visible, True, refresh=False).result()
+                assert patched == list(app.state.snapshot.symbols), f"step {step}: op {op} on {picked}"
+        finally:
+            app.blacklist.close()
+            app.keystrokes.stop()
+            app.state.stop()
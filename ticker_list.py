@@ -0,0 +1,162 @@
+from bisect import bisect_left, bisect_right
+
+
+class TickerNode:
+    __slots__ = ("symbol", "next", "prev")
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.next = None
+        self.prev = None
+
+
+class TickerLinkedList:
+    """
+    Circular doubly linked list of unique ticker symbols with a symbol -> node
+    index, so find, remove and membership checks are O(1).
+
+    A sorted copy of the symbols is kept next to the ring so insert_sorted can
+    find its neighbour with a binary search. Appending in order keeps it up
+    to date for free; an out-of-order add() marks it stale and the next
+    lookup rebuilds it once.
+    """
+
+    def __init__(self, symbols=None):
+        self.head = None
+        self._index = {}
+        self._sorted = []
+        self._sorted_stale = False
+        if symbols:
+            self.extend(symbols)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, symbol):
+        return symbol in self._index
+
+    def _normalize(self, symbol):
+        return (symbol or "").strip().upper()
+
+    def _link_before(self, new_node, anchor):
+        prev = anchor.prev
+        prev.next = new_node
+        new_node.prev = prev
+        new_node.next = anchor
+        anchor.prev = new_node
+
+    def add(self, symbol):
+        """Append symbol at the tail. Returns its node; an existing symbol is not added twice."""
+        symbol = self._normalize(symbol)
+        if not symbol:
+            return None
+        node = self._index.get(symbol)
+        if node:
+            return node
+        new_node = TickerNode(symbol)
+        self._index[symbol] = new_node
+        if not self.head:
+            self.head = new_node
+            self.head.next = self.head
+            self.head.prev = self.head
+        else:
+            self._link_before(new_node, self.head)
+
+        if not self._sorted_stale:
+            if not self._sorted or symbol > self._sorted[-1]:
+                self._sorted.append(symbol)
+            else:
+                self._sorted_stale = True
+        return new_node
+
+    def extend(self, symbols):
+        for symbol in symbols:
+            self.add(symbol)
+
+    @classmethod
+    def from_unique(cls, symbols):
+        """Build from symbols that are already normalized and unique (e.g. a saved ring), in one pass."""
+        ring = cls()
+        symbols = list(symbols)
+        if not symbols:
+            return ring
+        nodes = [TickerNode(s) for s in symbols]
+        prev = nodes[-1]
+        for node in nodes:
+            node.prev = prev
+            prev.next = node
+            prev = node
+        ring.head = nodes[0]
+        ring._index = dict(zip(symbols, nodes))
+        if all(a < b for a, b in zip(symbols, symbols[1:])):
+            ring._sorted = symbols
+        else:
+            ring._sorted_stale = True
+        return ring
+
+    def insert_sorted(self, symbol):
+        """Insert symbol in front of the first larger symbol, keeping a sorted ring sorted."""
+        symbol = self._normalize(symbol)
+        if not symbol:
+            return None
+        node = self._index.get(symbol)
+        if node:
+            return node
+        pos = bisect_right(self._sorted_symbols(), symbol)
+        if pos == len(self._sorted):
+            return self.add(symbol)
+
+        successor = self._index[self._sorted[pos]]
+        new_node = TickerNode(symbol)
+        self._index[symbol] = new_node
+        self._sorted.insert(pos, symbol)
+        self._link_before(new_node, successor)
+        if successor is self.head:
+            self.head = new_node
+        return new_node
+
+    def _sorted_symbols(self):
+        if self._sorted_stale:
+            self._sorted = sorted(self._index)
+            self._sorted_stale = False
+        return self._sorted
+
+    def remove(self, symbol):
+        symbol = self._normalize(symbol)
+        current = self._index.pop(symbol, None)
+        if current is None:
+            return False
+
+        if current.next is current:
+            self.head = None
+        else:
+            current.prev.next = current.next
+            current.next.prev = current.prev
+            if current is self.head:
+                self.head = current.next
+        # The removed node keeps its next/prev, so a walker sitting on it can still step off
+
+        if not self._sorted_stale:
+            pos = bisect_left(self._sorted, symbol)
+            if pos < len(self._sorted) and self._sorted[pos] == symbol:
+                del self._sorted[pos]
+        return True
+
+    def clear(self):
+        self.head = None
+        self._index.clear()
+        self._sorted = []
+        self._sorted_stale = False
+
+    def __iter__(self):
+        current = self.head
+        if not current:
+            return
+        while True:
+            yield current.symbol
+            current = current.next
+            if current == self.head:
+                break
+
+    def find(self, symbol):
+        return self._index.get(symbol)
@@ -0,0 +1,145 @@
+import customtkinter as ctk
+
+ROW_HEIGHT = 60
+ROW_COLOR = "#f0f0f0"
+ROW_HOVER_COLOR = "#d3d3d3"
+
+
+class _PooledRow:
+    """One row widget that gets rebound to whichever symbol is scrolled into its slot."""
+
+    def __init__(self, master, on_remove):
+        self.symbol = None
+        self.frame = ctk.CTkFrame(master, fg_color=ROW_COLOR, height=ROW_HEIGHT - 10)
+        self.frame.bind("<Enter>", lambda e: self.frame.configure(fg_color=ROW_HOVER_COLOR))
+        self.frame.bind("<Leave>", lambda e: self.frame.configure(fg_color=ROW_COLOR))
+
+        self.label = ctk.CTkLabel(self.frame, text="", font=("Arial", 16), anchor="w")
+        self.label.place(relx=0.02, rely=0.5, anchor="w")
+
+        self.button = ctk.CTkButton(self.frame, text="Remove", width=100,
+                                    command=lambda: self.symbol and on_remove(self.symbol))
+        self.button.place(relx=0.95, rely=0.5, anchor="e")
+        self.visible = False
+
+    def show(self, symbol, y):
+        if symbol != self.symbol:
+            self.symbol = symbol
+            self.label.configure(text=symbol)
+        if not self.visible:
+            self.frame.place(x=0, y=y, relwidth=1.0)
+            self.visible = True
+
+    def hide(self):
+        self.symbol = None
+        if self.visible:
+            self.frame.place_forget()
+            self.visible = False
+
+
+class VirtualTickerList(ctk.CTkFrame):
+    """
+    Scrollable list of ticker rows that only keeps about one screen of row
+    widgets alive. Scrolling rebinds the pooled rows to different symbols
+    instead of creating or packing widgets, so a refresh costs the same for
+    50 symbols as for 5,000.
+    """
+
+    def __init__(self, master, on_remove, width=850, height=600, **kwargs):
+        super().__init__(master, width=width, height=height, **kwargs)
+        self.on_remove = on_remove
+        self.symbols = []
+        self._positions = None
+        self.first = 0
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent", width=width - 20, height=height)
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.rows = []
+        self.page_size = max(1, height // ROW_HEIGHT)
+        self._ensure_pool(height)
+
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel, add="+")
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-1), add="+")
+        widget.bind("<Button-5>", lambda e: self.scroll_by(1), add="+")
+
+    def _ensure_pool(self, height):
+        needed = max(1, height // ROW_HEIGHT + 1)
+        while len(self.rows) < needed:
+            row = _PooledRow(self.body, self.on_remove)
+            for widget in (row.frame, row.label, row.button):
+                self._bind_wheel(widget)
+            self.rows.append(row)
+
+    def _on_resize(self, event):
+        # event sizes are in screen pixels, row geometry is in unscaled CTk units
+        height = int(event.height / self._get_widget_scaling())
+        self.page_size = max(1, height // ROW_HEIGHT)
+        self._ensure_pool(height)
+        self.redraw()
+
+    def _on_wheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        if event.delta:
+            rows = max(1, abs(event.delta) // 120)
+            self.scroll_by(-rows if event.delta > 0 else rows)
+
+    def set_symbols(self, symbols):
+        self.symbols = symbols
+        self._positions = None
+        self.redraw()
+
+    def scroll_by(self, rows):
+        self.scroll_to_index(self.first + rows)
+
+    def scroll_to_index(self, index):
+        last_first = max(0, len(self.symbols) - self.page_size)
+        self.first = min(max(0, index), last_first)
+        self.redraw()
+
+    def see(self, symbol):
+        """Scroll just enough to bring symbol on screen."""
+        if hasattr(self.symbols, "position"):
+            # A SortedSymbols snapshot finds it with a binary search
+            index = self.symbols.position(symbol)
+        else:
+            if self._positions is None:
+                # Built on the first lookup after a refresh, so set_symbols stays O(1)
+                self._positions = {s: i for i, s in enumerate(self.symbols)}
+            index = self._positions.get(symbol)
+        if index is None:
+            return
+        if index < self.first:
+            self.scroll_to_index(index)
+        elif index >= self.first + self.page_size:
+            self.scroll_to_index(index - self.page_size + 1)
+
+    def yview(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to_index(int(float(args[1]) * len(self.symbols)))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.scroll_by(amount * self.page_size if args[2] == "pages" else amount)
+
+    def redraw(self):
+        total = len(self.symbols)
+        self.first = min(self.first, max(0, total - self.page_size))
+        for i, row in enumerate(self.rows):
+            index = self.first + i
+            if index < total:
+                row.show(self.symbols[index], i * ROW_HEIGHT + 5)
+            else:
+                row.hide()
+
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.page_size) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
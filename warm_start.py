@@ -0,0 +1,98 @@
+import os
+import struct
+import zlib
+
+MAGIC = b"STKWARM\n"
+VERSION = 1
+_HEADER = struct.Struct("<HI")  # version, number of source files
+_SOURCE = struct.Struct("<qq")  # mtime_ns, size (-1 if the file is missing)
+_STATE = struct.Struct("<BiI")  # flags, nav index, payload length
+INCLUDE_FETCHED = 1
+LISTS = ("original", "fetched", "blacklist", "visible")
+
+
+class WarmState:
+    """What a launch needs to show the list and resume navigation without re-reading the text files."""
+
+    __slots__ = ("original", "fetched", "blacklist", "visible", "include_fetched", "current", "index", "last")
+
+    def __init__(self, original=(), fetched=(), blacklist=(), visible=(), include_fetched=False,
+                 current=None, index=0, last=None):
+        self.original = list(original)
+        self.fetched = list(fetched)
+        self.blacklist = set(blacklist)
+        self.visible = list(visible)
+        self.include_fetched = include_fetched
+        self.current = current
+        self.index = index
+        self.last = last
+
+
+def source_stamps(paths):
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamps.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamps.append((0, -1))
+    return stamps
+
+
+def save(path, state, sources):
+    """
+    Write `state` to `path`, stamped with the mtime and size of each of the
+    `sources` it was computed from. Call it after those files are flushed.
+    """
+    blocks = [
+        "\n".join(state.original),
+        "\n".join(state.fetched),
+        "\n".join(sorted(state.blacklist)),
+        "\n".join(state.visible),
+        "\n".join((state.current or "", state.last or "")),
+    ]
+    payload = zlib.compress("\0".join(blocks).encode("utf-8"), 1)
+    flags = INCLUDE_FETCHED if state.include_fetched else 0
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + _HEADER.pack(VERSION, len(sources)))
+        for stamp in source_stamps(sources):
+            f.write(_SOURCE.pack(*stamp))
+        f.write(_STATE.pack(flags, state.index, len(payload)))
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def load(path, sources):
+    """
+    The WarmState saved at `path`, or None if there is none, it was written
+    by another version, or any of the `sources` changed since.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    try:
+        if not data.startswith(MAGIC):
+            return None
+        offset = len(MAGIC)
+        version, count = _HEADER.unpack_from(data, offset)
+        if version != VERSION or count != len(sources):
+            return None
+        offset += _HEADER.size
+        saved = [_SOURCE.unpack_from(data, offset + i * _SOURCE.size) for i in range(count)]
+        if saved != source_stamps(sources):
+            return None
+        offset += count * _SOURCE.size
+        flags, index, length = _STATE.unpack_from(data, offset)
+        offset += _STATE.size
+        blocks = zlib.decompress(data[offset:offset + length]).decode("utf-8").split("\0")
+    except (struct.error, zlib.error, UnicodeDecodeError):
+        return None
+    if len(blocks) != len(LISTS) + 1:
+        return None
+    lists = [block.split("\n") if block else [] for block in blocks[:len(LISTS)]]
+    current, last = blocks[-1].split("\n")
+    return WarmState(*lists, include_fetched=bool(flags & INCLUDE_FETCHED),
+                     current=current or None, index=index, last=last or None)
@@ -0,0 +1,442 @@
+import os
+import threading
+import time
+import metrics
+import warm_start
+from finviz_cache import ResponseCache
+from blacklist_store import BlacklistStore
+from write_behind import WriteBehindWriter
+from sqlite_store import SQLiteBlacklist, SQLiteStore
+from snapshot_history import SnapshotHistory
+from symbol_master import SymbolMaster
+from ticker_list import TickerLinkedList
+
+STOCK_URL = "https://finviz.com/screener.ashx?v=111&f=cap_largeover,ta_alltime_b40h"
+ETF_URL = "https://finviz.com/screener.ashx?v=111&f=ind_exchangetradedfund,sh_avgvol_o1000,ta_alltime_b40h"
+# Used until screeners.txt exists
+DEFAULT_SCREENERS = {"Stocks": STOCK_URL, "ETFs": ETF_URL}
+
+
+def parse_screeners(lines):
+    """
+    Read "name url" lines (screeners.txt) into an ordered {name: url} dict.
+    Names may contain spaces, URLs can't; blank lines and # comments are
+    skipped. Raises ValueError naming the first bad line.
+    """
+    screeners = {}
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.rsplit(None, 1)
+        if len(parts) != 2 or not parts[1].startswith(("http://", "https://")):
+            raise ValueError(f"Line {number}: expected a name and then a screener URL, got '{line}'")
+        name, url = " ".join(parts[0].split()), parts[1]
+        if name in screeners:
+            raise ValueError(f"Line {number}: there is already a screener called '{name}'")
+        screeners[name] = url
+    return screeners
+
+
+class Watchlist:
+    """
+    The watchlist, fetched screener results and blacklist as stored in
+    original.txt / fetched.txt / blacklist.txt (or stocks.db), without any
+    window or keyboard hook. TypingProgram builds the GUI on top of this and
+    the command-line mode in stocks.py uses it directly.
+    """
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.original_file = os.path.join(self.base_path, "original.txt")
+        self.fetched_file  = os.path.join(self.base_path, "fetched.txt")
+        self.blacklist_file = os.path.join(self.base_path, "blacklist.txt")
+        self.db_file = os.path.join(self.base_path, "stocks.db")
+        self.rows_file = os.path.join(self.base_path, "fetched_rows.npz")
+        self.tags_file = os.path.join(self.base_path, "fetched_tags.txt")
+        self.screeners_file = os.path.join(self.base_path, "screeners.txt")
+        self.warm_start_file = os.path.join(self.base_path, "warm_start.bin")
+        # Exchange listing dump to check new symbols against (optional); STOCKS_SYMBOL_MASTER points elsewhere
+        self.symbol_master_file = os.environ.get("STOCKS_SYMBOL_MASTER") or os.path.join(self.base_path, "symbol_master.txt")
+        self.symbol_master_index = os.path.join(self.base_path, "symbol_master.idx")
+        self._symbol_master = None
+        self.screeners = self._load_screeners()
+        # Processes to parse screener pages in (STOCKS_PARSE_PROCESSES); 0 parses on the fetching threads
+        self.parse_processes = int(os.environ.get("STOCKS_PARSE_PROCESSES", "0"))
+        self._parse_pool = None
+
+        # Optional SQLite backend: opt in with STOCKS_STORAGE=sqlite, then stocks.db keeps it on
+        self.db = None
+        if os.environ.get("STOCKS_STORAGE", "").lower() == "sqlite" or os.path.exists(self.db_file):
+            self.db = SQLiteStore(self.db_file)
+            self.db.import_text_files(self.original_file, self.fetched_file, self.blacklist_file)
+        # What the window saved on exit, if none of the text files changed since (see save_warm_start)
+        self.warm_state = None if self.db else warm_start.load(self.warm_start_file, self._warm_start_sources())
+        if self.db:
+            self.blacklist = SQLiteBlacklist(self.db)
+        else:
+            self.blacklist = BlacklistStore(self.blacklist_file,
+                                            symbols=self.warm_state.blacklist if self.warm_state else None)
+        self.response_cache = ResponseCache(os.path.join(self.base_path, "finviz_cache"))
+        self.history = SnapshotHistory(os.path.join(self.base_path, "fetched_history.log"))
+        self.original_ticker_symbols = TickerLinkedList()
+        self.watchlist_lock = threading.RLock()
+        self.original_writer = WriteBehindWriter(self._write_original, delay=0.5, name="original-writer")
+        self.fetched_tickers = []
+        self._screener_data = None
+        self._screener_tags = None
+
+        if self.db:
+            self.original_ticker_symbols.extend(self.db.watchlist())
+            self.fetched_tickers = self.db.fetched_symbols()
+            print(f"Loaded {len(self.original_ticker_symbols)} tickers and "
+                  f"{len(self.fetched_tickers)} fetched tickers from stocks.db")
+        elif self.warm_state:
+            self.original_ticker_symbols = TickerLinkedList.from_unique(self.warm_state.original)
+            self.fetched_tickers = self.warm_state.fetched
+            print(f"Loaded {len(self.original_ticker_symbols)} tickers and "
+                  f"{len(self.fetched_tickers)} fetched tickers from warm_start.bin")
+        else:
+            if not os.path.exists(self.original_file):
+                print("original.txt not found — starting with an empty ticker list.")
+            self._load_original_from_file()
+            print(f"Loaded {len(self.original_ticker_symbols)} tickers from original.txt")
+
+            self._load_fetched_from_file()
+            if self.fetched_tickers:
+                print(f"Loaded {len(self.fetched_tickers)} cached fetched tickers from fetched.txt")
+
+    def _atomic_write(self, path, lines):
+        tmp = path + ".tmp"
+        try:
+            with metrics.timer("persist.atomic_write"):
+                with open(tmp, "w") as f:
+                    for line in lines:
+                        f.write(line.rstrip("\n") + "\n")
+                os.replace(tmp, path)
+        except Exception:
+            try:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            except Exception:
+                pass
+            raise
+
+    def _load_screeners(self):
+        if not os.path.exists(self.screeners_file):
+            return dict(DEFAULT_SCREENERS)
+        with open(self.screeners_file, "r") as f:
+            return parse_screeners(f) or dict(DEFAULT_SCREENERS)
+
+    def save_screeners(self, screeners):
+        """Replace the screener set (a {name: url} dict) and write it to screeners.txt."""
+        self.screeners = dict(screeners)
+        self._atomic_write(self.screeners_file, [f"{name} {url}" for name, url in self.screeners.items()])
+
+    def _warm_start_sources(self):
+        # warm_start.bin is stale once any of these changes
+        return [self.original_file, self.fetched_file, self.blacklist_file,
+                self.blacklist_file + ".journal", self.blacklist_file + ".journal.old"]
+
+    def save_warm_start(self, visible, include_fetched=False, current=None, index=0, last=None):
+        """
+        Save the loaded lists, the visible list and the navigation position to
+        warm_start.bin so the next launch can skip parsing the text files.
+        Call it after close(), once the files it is stamped with are final.
+        """
+        if self.db:
+            return
+        state = warm_start.WarmState(list(self.original_ticker_symbols), self.fetched_tickers,
+                                     self.blacklist.snapshot(), visible, include_fetched, current, index, last)
+        try:
+            with metrics.timer("persist.warm_start"):
+                warm_start.save(self.warm_start_file, state, self._warm_start_sources())
+        except OSError as e:
+            print(f"Failed to save warm_start.bin: {e}")
+
+    def _load_fetched_from_file(self):
+        if os.path.exists(self.fetched_file):
+            with open(self.fetched_file, "r") as ff:
+                self.fetched_tickers = [line.strip().upper() for line in ff if line.strip()]
+        else:
+            self.fetched_tickers = []
+
+    def _load_original_from_file(self):
+        self.original_ticker_symbols = TickerLinkedList()
+        if not os.path.exists(self.original_file):
+            open(self.original_file, "w").close()
+        with open(self.original_file, "r") as file:
+            for line in file:
+                s = line.strip().upper()
+                if s:
+                    self.original_ticker_symbols.add(s)
+
+    def add_to_blacklist(self, tickers):
+        if not isinstance(tickers, (list, set)):
+            tickers = [tickers]
+
+        # Journaled in memory; blacklist.txt is rewritten in the background
+        return self.blacklist.add(tickers)
+
+    def load_blacklist(self):
+        return self.blacklist
+
+    def add_symbols(self, symbols):
+        with self.watchlist_lock:
+            for symbol in symbols:
+                self.original_ticker_symbols.insert_sorted(symbol)
+        self._persist_added(symbols)
+
+    def symbol_master(self):
+        """The SymbolMaster for the listing file, reindexed if it changed, or None if there is no file."""
+        if not os.path.exists(self.symbol_master_file):
+            return None
+        if self._symbol_master is None or self._symbol_master.stale():
+            if self._symbol_master:
+                self._symbol_master.close()
+            self._symbol_master = SymbolMaster(self.symbol_master_file, self.symbol_master_index)
+        return self._symbol_master
+
+    def check_symbols(self, symbols):
+        """
+        Split symbols into (listed, {unlisted: suggested spelling or None})
+        against the symbol master. Everything counts as listed without one.
+        """
+        master = self.symbol_master()
+        if master is None:
+            return list(symbols), {}
+        with metrics.timer("symbols.check"):
+            return master.check(symbols)
+
+    def remove_symbols(self, symbols):
+        """Drop symbols from the watchlist itself. Returns the ones that were in it."""
+        with self.watchlist_lock:
+            removed = [s for s in symbols if self.original_ticker_symbols.remove(s)]
+        if removed:
+            if self.db:
+                self.db.remove_watchlist(removed)
+            else:
+                self.save_ticker_symbols()
+        return removed
+
+    def _persist_added(self, symbols):
+        if self.db:
+            self.db.add_watchlist(symbols)
+        else:
+            self.save_ticker_symbols()
+
+    def save_ticker_symbols(self):
+        # Write-behind: bursts of adds are coalesced into one write of original.txt
+        self.original_writer.mark_dirty()
+
+    def _write_original(self):
+        with self.watchlist_lock:
+            symbols = sorted(set(self.original_ticker_symbols))
+
+        try:
+            self._atomic_write(self.original_file, symbols)
+        except Exception as e:
+            print(f"Failed atomic write original.txt: {e}")
+            with open(self.original_file, "w") as file:
+                for symbol in symbols:
+                    file.write(symbol + "\n")
+
+    def compute_visible_symbols(self, include_fetched=False):
+        """The sorted, de-duplicated symbols the list shows, minus the blacklist."""
+        blacklist = self.load_blacklist()
+
+        if self.db:
+            return self.db.visible_symbols(include_fetched=include_fetched)
+        if include_fetched:
+            if not self.fetched_tickers and os.path.exists(self.fetched_file):
+                self._load_fetched_from_file()
+            local_list = [s.upper() for s in self.original_ticker_symbols]
+            merged = sorted(set(local_list + self.fetched_tickers))
+            return [s for s in merged if s not in blacklist]
+        new_visible = [s for s in self.original_ticker_symbols if s not in blacklist]
+        return sorted(set(new_visible))
+
+    def last_fetch_time(self):
+        """When the saved screener results were fetched, or None if there are none."""
+        if self.db:
+            return self.db.last_fetched_at()
+        if os.path.exists(self.fetched_file):
+            return os.path.getmtime(self.fetched_file)
+        return None
+
+    def fetch(self, force_refresh=False, on_batch=None, on_progress=None, cancel=None, screeners=None, rows=False):
+        """
+        Scrape every screener, all at once, and save the union to fetched.txt
+        or stocks.db, and which screeners listed each ticker to
+        fetched_tags.txt (see screener_tags).
+        The symbols come from Finviz's compact tickers view, 1000 per request.
+        With rows=True the 20-row overview pages are read instead and the full
+        rows saved to fetched_rows.npz as well (see screener_data).
+
+        on_batch(tickers) is called after every page with that page's tickers, and
+        on_progress(pages_done, pages_total) as pages finish. `screeners` is a
+        {name: url} dict, by default self.screeners. Returns the
+        saved sorted symbols and the FetchReport; raises RuntimeError if no
+        page could be fetched at all, and finviz_scraper.FetchCancelled once
+        `cancel` (a threading.Event) is set; a cancelled fetch doesn't replace
+        the saved results or add to the history.
+        self.fetched_tickers is left to the caller.
+        """
+        # requests and the parsers are only needed here, so they stay out of startup
+        from finviz_scraper import FetchCancelled, FetchReport, iter_screeners
+
+        screeners = dict(screeners or self.screeners)
+        fetched = set()
+        row_data = []
+        tags = {}
+        report = FetchReport(on_progress)
+        started = time.time()
+        for name, batch in iter_screeners(screeners, cache=self.response_cache, force_refresh=force_refresh,
+                                          report=report, rows=rows, cancel=cancel, parser=self._parser(),
+                                          view="overview" if rows else "tickers", tags=tags):
+            if rows:
+                row_data.extend(batch)
+                batch = [row["Ticker"] for row in batch]
+            fetched.update(s.strip().upper() for s in batch if s and s.strip())
+            if on_batch:
+                on_batch([s.strip().upper() for s in batch if s and s.strip()])
+
+        if cancel is not None and cancel.is_set():
+            raise FetchCancelled(", ".join(screeners))
+        metrics.observe("finviz.fetch", time.time() - started)
+        fetched_set = sorted(fetched)
+        print(f"Fetch finished: {report.summary()}")
+        if not fetched_set and not report.ok:
+            raise RuntimeError(report.summary())
+
+        if self.db:
+            # Batches only hold tickers no other screen had yet; `tags` has every screen's own list
+            by_screen = {name: [] for name in screeners}
+            for ticker, names in tags.items():
+                for name in names:
+                    by_screen[name].append(ticker)
+            for name, tickers in by_screen.items():
+                self.db.upsert_fetched(screeners[name], tickers, started)
+            # Only forget tickers that left the screens when every page came back
+            if report.ok:
+                for url in screeners.values():
+                    self.db.prune_fetched(url, started)
+                self.db.prune_sources(screeners.values())
+            fetched_set = self.db.fetched_symbols()
+        else:
+            try:
+                self._atomic_write(self.fetched_file, fetched_set)
+            except Exception as e:
+                print(f"Atomic write failed for fetched.txt: {e}")
+                with open(self.fetched_file, "w") as ff:
+                    for t in fetched_set:
+                        ff.write(t + "\n")
+        # A partial fetch would show every ticker on the failed pages as having left the screen
+        if report.ok:
+            with metrics.timer("persist.history"):
+                self.history.record(fetched_set, started)
+        if rows:
+            self._save_rows(row_data, complete=report.ok)
+        self._save_tags(tags, complete=report.ok)
+        return fetched_set, report
+
+    def _parser(self):
+        if self.parse_processes <= 0:
+            return None
+        if self._parse_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_processes)
+        return self._parse_pool
+
+    def screener_tags(self):
+        """{ticker: (names of the screeners that listed it)} as of the last fetch."""
+        if self._screener_tags is None:
+            tags = {}
+            if os.path.exists(self.tags_file):
+                with open(self.tags_file, "r") as f:
+                    for line in f:
+                        fields = line.rstrip("\n").split("\t")
+                        if len(fields) > 1:
+                            tags[fields[0]] = tuple(fields[1:])
+            self._screener_tags = tags
+        return self._screener_tags
+
+    def _save_tags(self, tags, complete):
+        merged = {} if complete else dict(self.screener_tags())
+        merged.update((ticker.strip().upper(), tuple(names)) for ticker, names in tags.items() if ticker.strip())
+        try:
+            self._atomic_write(self.tags_file, ["\t".join((t,) + merged[t]) for t in sorted(merged)])
+        except Exception as e:
+            print(f"Failed to save {os.path.basename(self.tags_file)}: {e}")
+        self._screener_tags = merged
+
+    def screener_data(self):
+        """Full screener rows of the fetched tickers as a ScreenerColumns, or None if NumPy isn't installed."""
+        if self._screener_data is None:
+            try:
+                from screener_columns import ScreenerColumns
+            except ImportError:
+                return None
+            data = None
+            if os.path.exists(self.rows_file):
+                try:
+                    data = ScreenerColumns.load(self.rows_file)
+                except Exception as e:
+                    print(f"Failed to load {os.path.basename(self.rows_file)}: {e}")
+            self._screener_data = data or ScreenerColumns.empty()
+        return self._screener_data
+
+    def _save_rows(self, rows, complete):
+        try:
+            from screener_columns import ScreenerColumns
+        except ImportError:
+            return
+        data = ScreenerColumns.from_rows(rows)
+        if not complete:
+            # Keep the old rows of tickers on pages that failed this time
+            data = self.screener_data().merge(data)
+        try:
+            with metrics.timer("persist.rows"):
+                data.save(self.rows_file)
+        except Exception as e:
+            print(f"Failed to save {os.path.basename(self.rows_file)}: {e}")
+        self._screener_data = data
+
+    def parse_row_query(self, query):
+        """
+        Parse a filter/sort over the screener row data, e.g. "volume > 5M, sort
+        by change desc", into (filters, sort); see screener_columns.parse_query.
+        Raises ValueError for a query that can't be read.
+        """
+        try:
+            from screener_columns import parse_query
+        except ImportError:
+            raise RuntimeError("Filtering and sorting by screener data needs NumPy (pip install numpy)")
+        return parse_query(query)
+
+    def query_symbols(self, symbols, query):
+        """
+        Filter and order symbols by their screener row data (see parse_row_query),
+        as saved by the last fetch with rows=True.
+        """
+        filters, sort = self.parse_row_query(query)
+        return self.screener_data().query(symbols, filters, sort)
+
+    def new_since_last_fetch(self):
+        """Tickers the last complete fetch found that the one before it didn't."""
+        return self.history.last_fetch_changes()[0]
+
+    def dropped_since(self, when):
+        """Tickers on the screens as of `when` (a timestamp) that are gone from the latest fetch."""
+        return self.history.changes_since(when)[1]
+
+    def close(self):
+        """Flush pending writes to disk."""
+        self.blacklist.close()
+        self.original_writer.flush()
+        if self._parse_pool:
+            self._parse_pool.shutdown(cancel_futures=True)
+        if self._symbol_master:
+            self._symbol_master.close()
+        if self.db:
+            self.db.close()
@@ -0,0 +1,79 @@
+import threading
+import time
+import metrics
+
+
+class WriteBehindWriter:
+    """
+    Coalesces save requests into a single deferred write.
+
+    mark_dirty() only records that state changed; one daemon thread calls
+    `write()` once no new change has arrived for `delay` seconds, or at the
+    latest `max_wait` seconds after the first unsaved change, so a steady
+    stream of edits can't hold the write off forever. Any number of rapid
+    changes therefore costs one disk write, and writes never overlap
+    because flush() and the background thread share one write lock.
+    """
+
+    def __init__(self, write, delay=0.5, name="write-behind", max_wait=5.0):
+        self.write = write
+        self.delay = delay
+        self.max_wait = max(delay, max_wait)
+        self.name = name
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._due_at = None
+        self._deadline = None
+        self._worker = None
+        self.writes = 0
+
+    @property
+    def dirty(self):
+        return self._due_at is not None
+
+    def mark_dirty(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._due_at is None:
+                self._deadline = now + self.max_wait
+            self._due_at = min(now + self.delay, self._deadline)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+            self._changed.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._due_at is None:
+                    self._changed.wait()
+                remaining = self._due_at - time.monotonic()
+                if remaining > 0:
+                    self._changed.wait(remaining)
+                    continue
+                self._due_at = None
+            self._write()
+
+    def _write(self):
+        with self._write_lock:
+            self._write_locked()
+
+    def _write_locked(self):
+        try:
+            with metrics.timer(f"persist.{self.name}"):
+                self.write()
+            self.writes += 1
+        except Exception as e:
+            print(f"{self.name}: write failed: {e}")
+
+    def flush(self):
+        """
+        Run a pending write now on the calling thread, e.g. on shutdown.
+        Also waits for a write the background thread already started.
+        """
+        with self._write_lock:
+            with self._lock:
+                pending, self._due_at = self._due_at, None
+            if pending is not None:
+                self._write_locked()